@@ -0,0 +1,156 @@
+"""Micro-benchmarks for the decode and state pipeline.
+
+uv run scripts/benchmark.py [--profile NAME] [--seconds 1] [--save FILE] [--baseline FILE]
+
+Every sensor definition profile is loaded and fed synthetic register blocks.
+Reports operations per second and the peak memory allocated by a single call.
+With ``--baseline`` the run fails if a benchmark is slower than ``--tolerance``.
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from itertools import cycle
+from pathlib import Path
+
+from sunsynk import Sensor, SensorDefinitions
+from sunsynk.definitions import ALL_DEFS, import_defs
+from sunsynk.helpers import unpack_value
+from sunsynk.sensors import Sensor16
+from sunsynk.state import InverterState, group_sensors
+from sunsynk.utils import pretty_table
+
+type Bench = Callable[[], object]
+
+BLOCKS = 16
+"""Number of distinct synthetic register blocks per profile."""
+
+
+def generic_benchmarks() -> dict[str, Bench]:
+    """Benchmarks that do not depend on a profile."""
+    return {
+        "unpack_value 16-bit": lambda: unpack_value((0xFFFE,), signed=True),
+        "unpack_value 32-bit": lambda: unpack_value((0xFFFE, 0xFFFF), signed=True),
+    }
+
+
+def profile_benchmarks(defs: SensorDefinitions, seed: int) -> dict[str, Bench]:
+    """Benchmarks for one sensor definition profile."""
+    rnd = random.Random(seed)
+    sensors = list(dict.fromkeys(s for s in defs.all.values() if s.address))
+    addresses = sorted({a for s in sensors for a in s.address})
+    blocks = [{a: rnd.randrange(0x10000) for a in addresses} for _ in range(BLOCKS)]
+    next_block = cycle(blocks).__next__
+
+    changing = InverterState()
+    changing.track(*sensors)
+    steady = InverterState()
+    steady.track(*sensors)
+    steady.update(blocks[0])
+
+    plain = [
+        (s, tuple(blocks[0][a] for a in s.address))
+        for s in sensors
+        if type(s) is Sensor
+    ]
+
+    res: dict[str, Bench] = {
+        "InverterState.update": lambda: changing.update(next_block()),
+        "InverterState.update unchanged": lambda: steady.update(blocks[0]),
+        "Sensor.decoder": lambda: [s.decoder(r) for s, r in plain],
+        "group_sensors": lambda: list(group_sensors(sensors)),
+    }
+
+    s16 = [s for s in sensors if isinstance(s, Sensor16)]
+    if s16:
+        regs16 = cycle([(0x1234, 0x1), (0xFFFF, 0xFFFF), (0x10, 0x0)]).__next__
+        res["Sensor16.reg_to_value"] = lambda: [s.reg_to_value(regs16()) for s in s16]
+
+    target = next((s.id for s in sensors if type(s) is Sensor), None)
+    if target:
+        overrides = {f"{target}.factor": 2}
+        res["SensorDefinitions.override"] = lambda: defs.copy().override(overrides)
+    return res
+
+
+def measure(func: Bench, seconds: float) -> tuple[float, int]:
+    """Return the best operations per second and the peak bytes of one call."""
+    func()  # warm up
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    repeat = max(3, int(seconds / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return 1 / best, peak
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: Path, tolerance: float
+) -> list[str]:
+    """Return the benchmarks slower than the baseline by more than the tolerance."""
+    base: dict[str, dict[str, float]] = json.loads(baseline.read_text())
+    slow: list[str] = []
+    for key, res in results.items():
+        old = base.get(key)
+        if old and res["ops"] < old["ops"] * (1 - tolerance):
+            slow.append(f"{key}: {res['ops']:,.0f} ops/s (baseline {old['ops']:,.0f})")
+    return slow
+
+
+def main() -> int:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--profile", action="append", choices=ALL_DEFS, help="default: all"
+    )
+    parser.add_argument("--seconds", type=float, default=1, help="per benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON from a previous --save")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    benches: dict[tuple[str, str], Bench] = {
+        ("-", k): v for k, v in generic_benchmarks().items()
+    }
+    for name in args.profile or ALL_DEFS:
+        for key, func in profile_benchmarks(import_defs(name), args.seed).items():
+            benches[name, key] = func
+
+    results: dict[str, dict[str, float]] = {}
+    rows: list[list[str]] = []
+    for (profile, key), func in benches.items():
+        ops, peak = measure(func, args.seconds)
+        results[f"{profile}: {key}"] = {"ops": ops, "peak": peak}
+        rows.append(
+            [profile, key, f"{ops:,.0f}", f"{1e6 / ops:,.2f}", f"{peak / 1024:,.1f}"]
+        )
+        print(f"{profile}: {key} {ops:,.0f} ops/s", file=sys.stderr)
+
+    print(f"{len(benches)} benchmarks, {BLOCKS} register blocks per profile")
+    headers = ["Profile", "Benchmark", "ops/s", "µs/op", "peak KiB"]
+    print(pretty_table(headers, rows, wrap_length=0))
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2), encoding="utf8")
+    if args.baseline:
+        slow = compare(results, args.baseline, args.tolerance)
+        if slow:
+            print("Slower than the baseline:\n  " + "\n  ".join(slow))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
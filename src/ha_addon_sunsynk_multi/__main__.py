@@ -15,8 +15,9 @@ from .a_sensor import MQTT, SS_TOPIC
 from .driver import callback_discovery_info, init_driver
 from .errors import print_errors
 from .options import OPT
-from .sensor_callback import build_callback_schedule
+from .sensor_callback import build_callback_schedule, check_bus_load
 from .sensor_options import SOPT
+from .startup_profile import PROFILE
 from .timer_callback import (
     CALLBACKS,
     AsyncCallback,
@@ -29,9 +30,10 @@ from .timer_schedule import init_schedules
 _LOG = logging.getLogger(__name__)
 
 
-async def main_loop() -> int:
+async def main_loop() -> int:  # noqa: PLR0915
     """Entry point."""
-    await OPT.init_addon()
+    with PROFILE.phase("OPT.init_addon"):
+        await OPT.init_addon()
 
     # Print version added during build & pyproject version
     ver = ""
@@ -46,14 +48,16 @@ async def main_loop() -> int:
     _LOG.info("sunsynk library - commit %s - last stable version %s", ver, VERSION)
 
     try:
-        init_driver(OPT)
+        with PROFILE.phase("init_driver"):
+            init_driver(OPT)
     except (TypeError, ValueError) as err:
         _LOG.critical(str(err))
         return 1
-    init_schedules(OPT.schedules)
-    SOPT.init_sensors()
-    for ist in STATE:
-        ist.init_sensors()
+    with PROFILE.phase("SOPT.init_sensors"):
+        init_schedules(OPT.schedules)
+        SOPT.init_sensors()
+        for ist in STATE:
+            ist.init_sensors()
 
     HASS_DISCOVERY_INFO_UPDATE_QUEUE.clear()
 
@@ -71,8 +75,13 @@ async def main_loop() -> int:
 
     for ist in STATE:
         try:
-            await ist.connect()
-            await ist.hass_discover_sensors()
+            with PROFILE.phase(f"{ist.opt.ha_prefix} connect"):
+                await ist.connect()
+            if not ist.restored:  # Initial read for all sensors
+                await ist.read_configured()
+            with PROFILE.phase(f"{ist.opt.ha_prefix} hass_discover_sensors"):
+                await ist.hass_discover_sensors()
+            await ist.publish_snapshot()
             build_callback_schedule(ist)
             CALLBACKS.append(ist.cb)
 
@@ -91,11 +100,18 @@ async def main_loop() -> int:
 
         except (ConnectionError, ValueError) as err:
             ist.log_bold(str(err))
+            if OPT.startup_profile:
+                _LOG.info("Startup profile\n%s", PROFILE.table())
             _LOG.critical(
                 "This Add-On will terminate in 30 seconds, use the Supervisor Watchdog to restart automatically."
             )
             return 2
 
+    check_bus_load(STATE)
+
+    if OPT.startup_profile:
+        PROFILE.log(wait=[ist.cb.task for ist in STATE if ist.cb.task])
+
     async def on_ha_connected() -> None:
         """When MQTT is connected, ensure we update MQTT availability states."""
         for ist in STATE:
@@ -1,27 +1,33 @@
 """Inverter state."""
 
 import asyncio
+import json
 import logging
 import statistics
 import time
 from collections.abc import Iterable
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, ClassVar, Literal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar, Literal
 
-from mqtt_entity import MQTTDevice, MQTTSensorEntity, MQTTSwitchEntity
+from mqtt_entity import MQTTDevice, MQTTEntity, MQTTSensorEntity, MQTTSwitchEntity
+from mqtt_entity.utils import BOOL_OFF, BOOL_ON
 
+from sunsynk.arbiter import BusArbiter
 from sunsynk.connection import ModbusConnection
 from sunsynk.helpers import slug
 from sunsynk.identity import Identity, suggested_sensor_definitions
 from sunsynk.rwsensors import RWSensor
 from sunsynk.state import InverterState
-from sunsynk.sunsynk import Sensor, Sunsynk, ValType
+from sunsynk.sunsynk import BatchTuner, BusAirtime, Sensor, Sunsynk, ValType
 from sunsynk.utils import percentile, pretty_table_sensors
 
 from .a_sensor import MQTT, SS_TOPIC, ASensor
+from .helpers import get_root
 from .near_realtime import NEAR_REALTIME
 from .options import OPT, InverterOptions
 from .sensor_options import DEFS, SOPT, SensorOptions
+from .startup_profile import PROFILE
 from .timer_callback import AsyncCallback
 
 if TYPE_CHECKING:
@@ -68,6 +74,20 @@ class AInverter:
     write_queue: dict[Sensor, str | int | float | bool] = field(default_factory=dict)
     """Write queue for RWSensors."""
 
+    _publish_pending: dict[ASensor, ValType] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    """States queued while a publish burst is in flight (latest value wins)."""
+    _publishing: bool = field(default=False, init=False, repr=False)
+    _json_last: dict[str, ValType] = field(default_factory=dict, init=False, repr=False)
+    """Values last sent in the JSON state document."""
+    _json_snapshot_at: float = field(default=0, init=False, repr=False)
+    restored: int = field(default=0, init=False)
+    """Sensors restored from the register snapshot, before the first full read."""
+
+    discovery_hashes: dict[str, int] = field(default_factory=dict, init=False)
+    """Hash of the last discovery payload, keyed by unique_id."""
+
     # Reporting stats
     entity_timeout: MQTTSensorEntity = field(init=False)
     entity_cbstats: MQTTSensorEntity = field(init=False)
@@ -86,6 +106,59 @@ class AInverter:
     solarman_ports: ClassVar[set[str]] = set()
     """Ports already used for a Solarman unit (sharing is untested)."""
 
+    tuners: ClassVar[dict[str, BatchTuner]] = {}
+    """Shared batch size tuners, keyed by port."""
+
+    arbiters: ClassVar[dict[str, BusArbiter]] = {}
+    """Bus arbiters of the ports shared by several inverters, keyed by port."""
+
+    airtimes: ClassVar[dict[str, BusAirtime]] = {}
+    """Bus byte and airtime accounting, keyed by port."""
+
+    @property
+    def json_topic(self) -> str:
+        """MQTT topic for the JSON state document (MQTT_JSON_STATE)."""
+        return f"{SS_TOPIC}/{self.opt.ha_prefix}/state_json"
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Register snapshot file (REGISTER_SNAPSHOT)."""
+        return get_root() / f"registers_{slug(self.opt.serial_nr)}.bin"
+
+    def restore_snapshot(self) -> int:
+        """Load the last saved registers. Return the number of sensors restored."""
+        path = self.snapshot_path
+        if not path.exists():
+            return 0
+        try:
+            restored = self.state.restore(path.read_bytes())
+        except (OSError, ValueError) as err:
+            _LOG.warning("Could not restore %s: %s", path, err)
+            return 0
+        _LOG.info("Restored %s sensors from %s", len(restored), path)
+        return len(restored)
+
+    def save_snapshot(self) -> None:
+        """Save the registers, replacing the previous snapshot."""
+        path = get_root(create=True) / self.snapshot_path.name
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(self.state.snapshot())
+            tmp.replace(path)
+        except OSError as err:
+            _LOG.warning("Could not save %s: %s", path, err)
+
+    async def publish_snapshot(self) -> None:
+        """Publish the restored values that were not read yet."""
+        states = {
+            self.ss[sen.id]: self.state[sen]
+            for sen in self.state.stale
+            if sen.id in self.ss and self.state[sen] is not None
+        }
+        if states:
+            _LOG.info("Publishing %s last-known values", len(states))
+            await self.publish_sensors(states=states)
+
     @property
     def availability_topic(self) -> str:
         """MQTT topic: ``online`` / ``offline`` reflect poll-loop lifecycle (retained)."""
@@ -250,15 +323,71 @@ class AInverter:
         return True
 
     async def publish_sensors(self, *, states: dict[ASensor, ValType]) -> None:
-        """Publish state to HASSH."""
+        """Publish state to HASS.
+
+        States arriving while an earlier burst is in flight are coalesced into the
+        next burst, so slow publishes never pile up across ticks.
+        """
+        self._publish_pending.update(states)
+        if self._publishing:
+            return
+        self._publishing = True
+        try:
+            while self._publish_pending:
+                burst, self._publish_pending = self._publish_pending, {}
+                await self._publish_burst(burst)
+        finally:
+            self._publishing = False
+
+    async def _publish_burst(self, states: dict[ASensor, ValType]) -> None:
+        """Publish concurrently, with at most MQTT_PUBLISH_CONCURRENCY in flight."""
+        sem = asyncio.Semaphore(max(1, OPT.mqtt_publish_concurrency))
+        dedup = OPT.mqtt_publish_dedup
+
+        async def _publish(state: ASensor, value: ValType) -> None:
+            async with sem:
+                await state.publish(value, dedup=dedup)
+
+        tasks = []
+        doc: dict[str, ValType] = {}
         for state, value in states.items():
-            # Entity was never created, don't publish state
-            if not state.entity:
+            if not state.entity:  # Entity was never created, don't publish state
                 continue
-            if value is None:
-                await state.publish(self.state[state.opt.sensor])
+            val = self.state[state.opt.sensor] if value is None else value
+            if state.json_key:
+                if val is not None:
+                    doc[state.json_key] = val
             else:
-                await state.publish(value)
+                tasks.append(_publish(state, val))
+        if doc:
+            tasks.append(self.publish_json(doc))
+
+        res = await asyncio.gather(*tasks, return_exceptions=True)
+        for err in res:
+            if isinstance(err, Exception):
+                _LOG.error("MQTT publish failed: %s", err)
+
+    async def publish_json(self, values: dict[str, ValType]) -> None:
+        """Publish values as one JSON document on the ``json_topic``.
+
+        Only changed keys are sent, except for a full snapshot of all the known
+        values every MQTT_JSON_SNAPSHOT seconds.
+        """
+        now = time.monotonic()
+        if now >= self._json_snapshot_at:
+            self._json_snapshot_at = now + OPT.mqtt_json_snapshot
+            self._json_last.update(values)
+            doc = self._json_last
+        else:
+            doc = {k: v for k, v in values.items() if self._json_last.get(k) != v}
+            if not doc:
+                return
+            self._json_last.update(doc)
+        payload = {
+            k: (BOOL_ON if v else BOOL_OFF) if isinstance(v, bool) else v
+            for k, v in doc.items()
+        }
+        await MQTT.publish(self.json_topic, json.dumps(payload, separators=(",", ":")))
 
     async def connect(self) -> None:
         """Connect."""
@@ -286,6 +415,8 @@ class AInverter:
         self.warn_device_type_config()
         self.serial_matches_config()
 
+        self.restored = self.restore_snapshot() if OPT.register_snapshot else 0
+
         sensors = list(SOPT.startup)
         _LOG.info("Reading startup sensors %s", ", ".join(s.name for s in sensors))
 
@@ -299,13 +430,19 @@ class AInverter:
         tab = pretty_table_sensors(sensors, self.state, [], {})
         _LOG.info("Inverter %s - startup sensors\n%s", self.index, tab)
 
-        # Initial read for all sensors
-        sensors = list(SOPT)
-        _LOG.info("Reading configured sensors %s", len(sensors))
-        await self.read_sensors(sensors=sensors)
         # tab = pretty_table_sensors(sensors, self.inv)
         # _LOG.info("Inverter %s - active sensors\n%s", self.inv.port, tab)
 
+    async def read_configured(self) -> None:
+        """Read all configured sensors (the first full read).
+
+        Called after ``connect``, or in the background when a snapshot was restored.
+        """
+        sensors = list(SOPT)
+        _LOG.info("Reading configured sensors %s", len(sensors))
+        with PROFILE.phase(f"{self.opt.ha_prefix} first full read"):
+            await self.read_sensors(sensors=sensors)
+
     @property
     def rated_power(self) -> float:
         """Return the inverter power."""
@@ -320,11 +457,19 @@ class AInverter:
         _LOG.info(f"{msg:^60}".rstrip())
         _LOG.info("#" * 60)
 
-    def hass_create_discovery_info(self) -> None:
-        """Create discovery info for the inverter."""
+    def hass_create_discovery_info(
+        self, sensors: Iterable[Sensor] | None = None
+    ) -> set[str]:
+        """Create discovery info for the inverter.
+
+        With ``sensors``, only their entities are rebuilt. Return the unique IDs of
+        the entities whose discovery payload changed.
+        """
         serial_nr = self.opt.serial_nr
 
         ids = list(self.mqtt_dev.components)
+        if sensors is not None:
+            ids = [s.id for s in sensors if s.id in self.mqtt_dev.components]
 
         if self.mqtt_dev.id == "":
             self.mqtt_dev = MQTTDevice(
@@ -340,6 +485,7 @@ class AInverter:
             )
             MQTT.devs.append(self.mqtt_dev)
             self.create_stats_entities()
+            ids = list(self.mqtt_dev.components)
             for s in self.ss.values():
                 if s.visible_on(self):  # type: ignore[arg-type]
                     ids.append(s.opt.sensor.id)
@@ -353,6 +499,21 @@ class AInverter:
             except Exception as err:
                 _LOG.error("Could not create MQTT entity for %s: %s", s, err)
 
+        changed: set[str] = set()
+        dev_id = self.mqtt_dev.id
+        for key in ids:
+            ent = self.mqtt_dev.components.get(key)
+            if ent is None:
+                continue
+            digest = hash(
+                json.dumps(ent.as_discovery_dict, sort_keys=True, default=str)
+            )
+            uid = ent.unique_id if isinstance(ent, MQTTEntity) else f"{dev_id}_{key}"
+            if self.discovery_hashes.get(uid) != digest:
+                self.discovery_hashes[uid] = digest
+                changed.add(uid)
+        return changed
+
     async def hass_discover_sensors(self) -> bool:
         """Discover all sensors."""
         self.hass_create_discovery_info()
@@ -372,7 +533,7 @@ class AInverter:
         # create state entry
         for sopt in soptions.values():
             sen = sopt.sensor
-            self.state.track(sen)
+            self.state.track(sen, history_size=sopt.schedule.history_size)
             self.ss[sen.id] = ASensor(opt=sopt, retain=isinstance(sen, RWSensor))
 
     def create_stats_entities(self) -> None:
@@ -441,7 +602,7 @@ class AInverter:
         times = self.cb.stat_time
         if not times:
             times = [0]
-        attr = {
+        attr: dict[str, Any] = {
             "count": len(times),
             "min": min(times),
             "max": max(times),
@@ -453,6 +614,15 @@ class AInverter:
             "busy_count": self.cb.stat_busy_count,
             "error_count": self.cb.stat_error_count,
         }
+        if self.inv.tuner is not None:
+            attr.update(self.inv.tuner.attributes())
+        if (arbiter := self.arbiters.get(self.inv.port)) is not None:
+            attr.update(arbiter.attributes())
+        if self.inv.airtime is not None:
+            attr.update(self.inv.airtime.attributes())
+        if OPT.register_snapshot:
+            attr["snapshot_stale"] = sorted(sen.id for sen in self.state.stale)
+            self.save_snapshot()
 
         await self.entity_cbstats.send_state(MQTT, attr["mean"])
         await self.entity_cbstats.send_json_attributes(MQTT, attr)
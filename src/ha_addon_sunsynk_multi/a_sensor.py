@@ -67,21 +67,26 @@ class ASensor:
 
     _last: ValType = None
     retain: bool = False
+    json_key: str = ""
+    "Key in the inverter's JSON state document, empty if it has its own topic."
 
     @property
     def value(self) -> ValType:
         """Return the last value."""
         return self._last
 
-    async def publish(self, val: ValType) -> None:
-        """Set the value through MQTT."""
+    async def publish(self, val: ValType, *, dedup: bool = False) -> None:
+        """Set the value through MQTT.
+
+        Unchanged values are skipped when retained, or with ``dedup``.
+        """
         if self.entity is None:
             _LOG.error("no entity %s", self.name)
             return
         if val is None:
             _LOG.debug("Cannot publish %s: value is None", self.name)
             return
-        if self._last == val and self.retain:
+        if self._last == val and (self.retain or dedup):
             return
         if self.opt.sensor.trace:
             _LOG._log(
@@ -111,7 +116,19 @@ class ASensor:
             return False
         return True
 
-    def create_entity(self, ist: "AInverter", /) -> MQTTEntity:  # noqa: PLR0911
+    def _json_template(self, entity: MQTTEntity) -> MQTTEntity:
+        """Read the state from the JSON document, keep it if the key is absent."""
+        if self.json_key:
+            key = self.json_key
+            keep = "this.state"
+            if isinstance(entity, MQTTBinarySensorEntity):
+                keep += " | upper"
+            entity.discovery_extra["value_template"] = (
+                f"{{{{ value_json['{key}'] if '{key}' in value_json else {keep} }}}}"
+            )
+        return entity
+
+    def create_entity(self, ist: "AInverter", /) -> MQTTEntity:  # noqa: PLR0911, PLR0915
         """Create HASS entity."""
         dev_id = ist.opt.serial_nr
         if not self.visible_on(ist):
@@ -134,12 +151,17 @@ class ASensor:
             "unit_of_measurement": sensor.unit,
         }
 
+        self.json_key = ""
+        if OPT.mqtt_json_state and not isinstance(sensor, RWSensor):
+            self.json_key = sensor.id
+            ent["state_topic"] = ist.json_topic
+
         if isinstance(sensor, EnumSensor):
             self.entity = MQTTSensorEntity(
                 **ent,
                 # options=sensor.available_values(),
             )
-            return self.entity
+            return self._json_template(self.entity)
 
         if not isinstance(sensor, RWSensor):
             ent["device_class"] = hass_device_class(unit=sensor.unit)
@@ -151,7 +173,7 @@ class ASensor:
                 if self.is_measurement(sensor.unit):
                     ent["state_class"] = "measurement"
                 self.entity = MQTTSensorEntity(**ent, suggested_display_precision=1)
-            return self.entity
+            return self._json_template(self.entity)
 
         def on_change_factory() -> TopicCallback:
             if old_ent := ist.mqtt_dev.components.get(sensor.id):
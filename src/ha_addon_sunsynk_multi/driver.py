@@ -5,9 +5,10 @@ import logging
 from typing import cast
 
 from sunsynk import Sensor, Sunsynk, ValType
+from sunsynk.arbiter import BusArbiter
 from sunsynk.connection import ModbusConnection, open_connection
 from sunsynk.solarman import SolarmanUnit
-from sunsynk.sunsynk import HoldingUnit
+from sunsynk.sunsynk import BatchTuner, BusAirtime, HoldingUnit
 
 from .a_inverter import STATE, AInverter
 from .a_sensor import MQTT
@@ -21,19 +22,26 @@ HASS_DISCOVERY_INFO_UPDATE_QUEUE: set[Sensor] = set()
 """Update Sensor discovery info."""
 
 
-async def callback_discovery_info(now: int) -> None:
+async def callback_discovery_info(now: float) -> None:
     """Update HASS discovery & write RWSensors."""
-    # Flush any pending discovery info updates
+    # Flush any pending discovery info updates, only if a payload changed
     if HASS_DISCOVERY_INFO_UPDATE_QUEUE:
+        changed: set[str] = set()
         for ist in STATE:
-            ist.hass_create_discovery_info()
-        await MQTT.publish_discovery_info()
+            changed |= ist.hass_create_discovery_info(HASS_DISCOVERY_INFO_UPDATE_QUEUE)
+        if changed:
+            _LOG.debug("Discovery info changed: %s", ", ".join(sorted(changed)))
+            await MQTT.publish_discovery_info()
         HASS_DISCOVERY_INFO_UPDATE_QUEUE.clear()
 
     # Publish statistics
     if now % 120 == 0:
         for ist in STATE:
             await ist.publish_stats(120)
+        for arbiter in AInverter.arbiters.values():
+            arbiter.reset()
+        for airtime in AInverter.airtimes.values():
+            airtime.reset()
 
 
 def sensor_on_update(sen: Sensor, _new: ValType, _old: ValType) -> None:
@@ -53,7 +61,10 @@ def _shared_modbus_connection(opt: Options, *, port: str) -> ModbusConnection:
     conn = AInverter.connections.get(port)
     if conn is None:
         conn = open_connection(
-            port, timeout=opt.timeout, message_spacing=opt.read_message_spacing
+            port,
+            baudrate=opt.baudrate,
+            timeout=opt.timeout,
+            message_spacing=opt.read_message_spacing,
         )
         AInverter.connections[port] = conn
         _LOG.debug("Opened Modbus connection for %s", port)
@@ -62,6 +73,26 @@ def _shared_modbus_connection(opt: Options, *, port: str) -> ModbusConnection:
     return conn
 
 
+def _shared_tuner(opt: Options, *, port: str) -> BatchTuner | None:
+    """One ``BatchTuner`` per port when the batch size is learned."""
+    if not opt.read_adaptive_batch_size:
+        return None
+    tuner = AInverter.tuners.get(port)
+    if tuner is None:
+        tuner = AInverter.tuners[port] = BatchTuner(size=opt.read_sensors_batch_size)
+    return tuner
+
+
+def _shared_airtime(opt: Options, *, port: str, spacing: float) -> BusAirtime:
+    """One ``BusAirtime`` per port, at the configured baud rate."""
+    airtime = AInverter.airtimes.get(port)
+    if airtime is None:
+        airtime = AInverter.airtimes[port] = BusAirtime(
+            baudrate=opt.baudrate, spacing=spacing
+        )
+    return airtime
+
+
 def create_sunsynk(opt: Options, iopt: InverterOptions) -> Sunsynk:
     """Build a per-inverter ``Sunsynk`` (shared connection when Modbus)."""
     port = iopt.port or opt.debug_device
@@ -79,10 +110,14 @@ def create_sunsynk(opt: Options, iopt: InverterOptions) -> Sunsynk:
         ss = Sunsynk(
             unit=unit,
             port=port,
+            baudrate=opt.baudrate,
             timeout=opt.timeout,
             read_attempts=opt.read_attempts,
             read_sensors_batch_size=opt.read_sensors_batch_size,
             allow_gap=opt.read_allow_gap,
+            request_cost=opt.read_request_cost,
+            tuner=_shared_tuner(opt, port=port),
+            airtime=_shared_airtime(opt, port=port, spacing=0),
         )
     else:
         conn = _shared_modbus_connection(opt, port=port)
@@ -91,10 +126,14 @@ def create_sunsynk(opt: Options, iopt: InverterOptions) -> Sunsynk:
             unit=cast(HoldingUnit, conn.for_unit(iopt.modbus_id)),
             connection=conn,
             port=port,
+            baudrate=opt.baudrate,
             timeout=opt.timeout,
             read_attempts=opt.read_attempts,
             read_sensors_batch_size=opt.read_sensors_batch_size,
             allow_gap=opt.read_allow_gap,
+            request_cost=opt.read_request_cost,
+            tuner=_shared_tuner(opt, port=port),
+            airtime=_shared_airtime(opt, port=port, spacing=opt.read_message_spacing),
         )
 
     _LOG.debug("Sunsynk: %s - inv:%s", ss, iopt)
@@ -106,9 +145,30 @@ def init_driver(opt: Options) -> None:
     STATE.clear()
     AInverter.connections.clear()
     AInverter.solarman_ports.clear()
+    AInverter.tuners.clear()
+    AInverter.arbiters.clear()
+    AInverter.airtimes.clear()
     for idx, inv in enumerate(opt.inverters):
         ss = create_sunsynk(opt, inv)
         ist = AInverter(opt=inv, index=idx, inv=ss)
         ss.state = ist.state
         ist.state.onchange = sensor_on_update
         STATE.append(ist)
+    _share_buses()
+
+
+def _share_buses() -> None:
+    """Route the inverters on a shared Modbus port through one ``BusArbiter``."""
+    ports: dict[str, list[AInverter]] = {}
+    for ist in STATE:
+        if ist.inv.port in AInverter.connections:
+            ports.setdefault(ist.inv.port, []).append(ist)
+    for port, ists in ports.items():
+        if len(ists) < 2:
+            continue
+        arbiter = AInverter.arbiters[port] = BusArbiter(
+            airtime=AInverter.airtimes.get(port)
+        )
+        for ist in ists:
+            ist.inv.unit = arbiter.unit(ist.inv.unit, key=ist.opt.modbus_id)
+        _LOG.info("%s inverters share %s: requests take turns", len(ists), port)
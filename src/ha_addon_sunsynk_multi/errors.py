@@ -19,7 +19,7 @@ def log_error(msg: str, exc: Exception | None = None) -> None:
         _LOG.error(msg)
 
 
-def print_errors(_: int) -> None:
+def print_errors(_: float) -> None:
     """Print errors."""
     if not ERRLIST:
         return
@@ -83,6 +83,22 @@ class Options(MQTTOptions):
     read_sensors_batch_size: int = 20
     read_message_spacing: float = 0.05
     """Seconds to wait after each Modbus reply before the next request (0 disables)."""
+    baudrate: int = 9600
+    """RS485 baud rate: of a serial port, or of the bus behind a gateway or dongle."""
+    read_adaptive_batch_size: bool = False
+    """Learn the batch size per port, starting at read_sensors_batch_size."""
+    read_request_cost: float = 0
+    """Cost of one Modbus request in registers, to group reads by cost (0 uses read_allow_gap)."""
+    register_snapshot: bool = False
+    """Save the registers, and publish the last-known values at startup."""
+    mqtt_publish_concurrency: int = 10
+    """MQTT state messages in flight at once per inverter."""
+    mqtt_publish_dedup: bool = False
+    """Skip publishing a sensor state equal to its last published state."""
+    mqtt_json_state: bool = False
+    """Publish read-only sensors as one JSON document per inverter."""
+    mqtt_json_snapshot: int = 300
+    """Seconds between full JSON documents, changed keys only in between."""
     schedules: list[Schedule] = field(default_factory=list)
     timeout: int = 3
     read_attempts: int = 3
@@ -94,6 +110,8 @@ class Options(MQTTOptions):
     """Quiet period (seconds) with no normal polling before a serial-only probe and possible recovery."""
 
     debug: int = 0
+    startup_profile: bool = False
+    """Log the wall time of each startup phase and of the module imports."""
     driver: str = ""
     """Obsolete; kept so legacy configs still load. Prefer ``solarman-tcp://`` PORT."""
     manufacturer: str = "Sunsynk"
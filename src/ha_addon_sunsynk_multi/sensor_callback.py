@@ -2,14 +2,15 @@
 
 import asyncio
 import logging
+import math
 from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Self
 
-from sunsynk import WATT, RWSensor, Sensor, ValType
+from sunsynk import WATT, RWSensor, Sensor, Sunsynk, ValType
 from sunsynk.utils import pretty_table, table_data
 
-from .a_inverter import AInverter
+from .a_inverter import STATE, AInverter
 from .a_sensor import ASensor, SensorOption
 from .near_realtime import NEAR_REALTIME
 from .sensor_options import SOPT
@@ -22,21 +23,39 @@ _LOG = logging.getLogger(__name__)
 class SensorRun:
     """Sensor run schedule."""
 
-    next_run: int = 0
+    next_run: float = 0
     sensors: set[SensorOption] = field(default_factory=set)
 
+    def due(self, now: float, every: float) -> bool:
+        """Whether the run is due at ``now``. If so, advance ``next_run``.
+
+        ``next_run`` steps by ``every``, so a callback tick that does not divide
+        ``every`` does not add drift. A late run catches up to ``now``.
+        """
+        if now % every == 0:
+            self.next_run = now + every
+            return True
+        if self.next_run > now + 1e-6:
+            return False
+        nxt = self.next_run + every
+        self.next_run = nxt if self.next_run and nxt > now + 1e-6 else now + every
+        return True
+
 
 @dataclass(slots=True)
 class SensorSchedule:
     """Sensor run schedule."""
 
-    read: dict[int, SensorRun] = field(default_factory=lambda: defaultdict(SensorRun))
+    read: dict[float, SensorRun] = field(default_factory=lambda: defaultdict(SensorRun))
     report: dict[int, SensorRun] = field(default_factory=lambda: defaultdict(SensorRun))
+    read_plans: dict[frozenset[float], frozenset[Sensor]] = field(default_factory=dict)
+    """Sensors to read per combination of due read intervals."""
 
     def build_schedules(self, idx: int) -> Self:
         """Build schedules."""
         self.read.clear()
         self.report.clear()
+        self.read_plans.clear()
         first = idx == 0
 
         for sopt in SOPT.values():
@@ -55,7 +74,35 @@ class SensorSchedule:
 
         return self
 
-    def print_schedule(self, title: str, idx: int, sch: dict[int, SensorRun]) -> None:
+    @property
+    def tick(self) -> float:
+        """Callback interval: 1 second, or the fastest sub-second read."""
+        return min(1, *self.read) if self.read else 1
+
+    def bus_load(self, inv: Sunsynk) -> float:
+        """Fraction of the time the reads keep the bus busy."""
+        return sum(
+            inv.read_time(self.read_plan(frozenset((sec,)))) / sec for sec in self.read
+        )
+
+    def slow_down(self, factor: float) -> None:
+        """Stretch the sub-second reads by ``factor``, up to 1 second."""
+        for sec in [s for s in self.read if s < 1]:
+            new = min(1, math.ceil(round(sec * factor * 10, 6)) / 10)
+            self.read[new].sensors.update(self.read.pop(sec).sensors)
+        self.read_plans.clear()
+
+    def read_plan(self, due: frozenset[float]) -> frozenset[Sensor]:
+        """Sensors to read for the due read intervals (memoized)."""
+        if (plan := self.read_plans.get(due)) is None:
+            plan = self.read_plans[due] = frozenset(
+                s.sensor for sec in due for s in self.read[sec].sensors
+            )
+        return plan
+
+    def print_schedule(
+        self, title: str, idx: int, sch: dict[float, SensorRun] | dict[int, SensorRun]
+    ) -> None:
         """Print the sensor schedule."""
         data = [
             {"s": e, "Sensors": ", ".join(s.sensor.id for s in r.sensors)}
@@ -66,14 +113,51 @@ class SensorSchedule:
         _LOG.debug("%s (inverter %s)\n%s", title, inv_ref, tab.get_string())
 
 
+def bus_phase(ist: AInverter) -> float:
+    """Spread the inverters on one port across the second, so reads take turns."""
+    peers = [i for i in STATE if i.opt.port == ist.opt.port]
+    idx = next((n for n, i in enumerate(peers) if i is ist), 0)
+    return idx / len(peers) if peers else 0
+
+
+def check_bus_load(ists: list[AInverter]) -> None:
+    """Estimate the bus time the read schedules need per port, warn above 100%.
+
+    Sub-second reads the bus cannot sustain are slowed down by that factor (up
+    to 1 second). Uses the round trip measured during the initial reads, or the
+    RTU airtime of the port when nothing was measured.
+    """
+    ports: dict[str, list[AInverter]] = {}
+    for ist in ists:
+        ports.setdefault(ist.inv.port, []).append(ist)
+    for port, peers in ports.items():
+        load = sum(ist.sched.bus_load(ist.inv) for ist in peers)
+        if load <= 1:
+            _LOG.info("The SCHEDULES need %.0f%% of the bus on %s", load * 100, port)
+            continue
+        slowed = [ist for ist in peers if ist.sched.tick < 1]
+        for ist in slowed:
+            ist.sched.slow_down(load)
+            ist.cb.every = ist.sched.tick
+            ist.cb.offset = bus_phase(ist) * ist.cb.every
+        _LOG.warning(
+            "The SCHEDULES need %.0f%% of the bus on %s (%s inverters). %s",
+            load * 100,
+            port,
+            len(peers),
+            "Sub-second reads are slowed down"
+            if slowed
+            else "Read less often, or read fewer sensors",
+        )
+
+
 def build_callback_schedule(ist: AInverter) -> None:  # noqa: PLR0915
     """Build the callback schedule."""
     ist.sched = SensorSchedule().build_schedules(ist.index)  # type: ignore[assignment]
     atsk = None
 
-    async def callback_sensor(now: int) -> None:  # noqa: PLR0915 PLR0912
+    async def callback_sensor(now: float) -> None:  # noqa: PLR0915 PLR0912
         """Read or write sensors."""
-        sensors_to_read: set[Sensor] = set()
         sensors_to_publish: set[ASensor] = set()
 
         if ist.lifecycle != "running":
@@ -95,11 +179,12 @@ def build_callback_schedule(ist: AInverter) -> None:  # noqa: PLR0915
             sensors_to_publish.add(ist.ss[sensor.id])
 
         # add all read items
+        due: list[float] = []
         for sec, srun in ist.sched.read.items():
-            if now % sec == 0 or srun.next_run <= now:
-                sensors_to_read.update(s.sensor for s in srun.sensors)
-                srun.next_run = now + sec
+            if srun.due(now, sec):
+                due.append(sec)
         # perform the read
+        sensors_to_read = ist.sched.read_plan(frozenset(due)) if due else frozenset()
         if sensors_to_read:
             _LOG.debug("Read: %s", len(sensors_to_read))
             await ist.read_sensors(
@@ -137,18 +222,20 @@ def build_callback_schedule(ist: AInverter) -> None:  # noqa: PLR0915
                     pub[asen] = last
                 ist.state.historynn[sensor] = [None, last]
             elif sensor in ist.state.history:
-                last = ist.state.history[sensor][-1]
-                if asen.opt.schedule.significant_change(
-                    history=ist.state.history[sensor][:-1],
+                hnum = ist.state.history[sensor]
+                last = hnum[-1]
+                prev = len(hnum) - 1
+                if asen.opt.schedule.is_significant(
+                    avg=(hnum.total - last) / prev if prev else None,
                     last=last,
                 ):
-                    ist.state.history[sensor].clear()
-                    ist.state.history[sensor].append(last)
+                    hnum.clear()
+                    hnum.append(last)
                     pub[asen] = last
 
         # check fixed reporting
         for sec, srun in ist.sched.report.items():
-            if now % sec == 0 or srun.next_run <= now:
+            if srun.due(now, sec):
                 # get list of ASensor from SensorOption
                 sens = [a for a in ist.ss.values() if a.opt in srun.sensors]
                 for asen in sens:
@@ -166,15 +253,19 @@ def build_callback_schedule(ist: AInverter) -> None:  # noqa: PLR0915
                         pub[asen] = ist.state.history_average(sensor)
                     except ValueError:
                         _LOG.warning("No history for %s", sensor)
-                srun.next_run = now + sec
 
         if pub:
             nonlocal atsk
             atsk = asyncio.create_task(ist.publish_sensors(states=pub))
 
+    every = ist.sched.tick
     ist.cb = AsyncCallback(
         name=f"read {ist.opt.ha_prefix}",
-        every=1,
+        every=every,
+        offset=bus_phase(ist) * every,
         callback=callback_sensor,
         keep_stats=True,
     )
+    if ist.restored:
+        # The poll skips its ticks (busy) until the full read after a restore is done
+        ist.cb.task = asyncio.create_task(ist.read_configured())
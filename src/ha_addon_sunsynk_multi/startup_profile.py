@@ -0,0 +1,105 @@
+"""Startup profile: wall time of each startup phase and of module imports."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from sunsynk.utils import pretty_table
+
+_LOG = logging.getLogger(__name__)
+
+IMPORT_ROWS = 20
+"""Modules listed in the import table."""
+
+
+@dataclass(slots=True)
+class StartupProfile:
+    """Phase timings, recorded on every start and logged with STARTUP_PROFILE."""
+
+    phases: list[tuple[str, float]] = field(default_factory=list)
+    start: float = field(default_factory=time.perf_counter)
+    task: asyncio.Task[None] | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase, also when it fails."""
+        perf = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - perf))
+
+    def table(self) -> str:
+        """Phases ranked by wall time, with their share of the startup."""
+        total = time.perf_counter() - self.start
+        rows = [
+            [name, f"{sec:.3f}", f"{sec / total:.0%}" if total else ""]
+            for name, sec in sorted(self.phases, key=lambda p: p[1], reverse=True)
+        ]
+        rows.append(["total", f"{total:.3f}", "100%"])
+        return str(pretty_table(["Phase", "Seconds", "Share"], rows, wrap_length=0))
+
+    def log(self, wait: Iterable[asyncio.Task[Any]] = ()) -> None:
+        """Log the phase table once ``wait`` is done, then the import times.
+
+        Runs in the background; ``wait`` are startup phases still running.
+        """
+
+        async def _log() -> None:
+            await asyncio.gather(*wait, return_exceptions=True)
+            _LOG.info("Startup profile\n%s", self.table())
+            await log_import_times()
+
+        self.task = asyncio.create_task(_log())
+
+
+def parse_importtime(text: str) -> list[tuple[str, int, int]]:
+    """Parse ``python -X importtime`` output into (module, self, cumulative) µs."""
+    res: list[tuple[str, int, int]] = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[12:].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header
+        res.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return res
+
+
+async def log_import_times(module: str = "ha_addon_sunsynk_multi.__main__") -> None:
+    """Import ``module`` in a fresh interpreter and log the slowest imports.
+
+    Imports are done before ``main_loop`` starts, so they are measured in a
+    subprocess that does not slow down this one.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-X",
+        "importtime",
+        "-c",
+        f"import {module}",
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, err = await proc.communicate()
+    imports = parse_importtime(err.decode(errors="replace"))
+    if not imports:
+        _LOG.warning("No import times for %s (exit code %s)", module, proc.returncode)
+        return
+    total = sum(s for _, s, _ in imports)
+    rows = [
+        [mod, f"{cum / 1e3:.1f}", f"{slf / 1e3:.1f}"]
+        for mod, slf, cum in sorted(imports, key=lambda i: i[2], reverse=True)
+    ][:IMPORT_ROWS]
+    tab = pretty_table(["Module", "Cumulative ms", "Self ms"], rows, wrap_length=0)
+    _LOG.info("Import profile: %s modules in %.3fs\n%s", len(imports), total / 1e6, tab)
+
+
+PROFILE = StartupProfile()
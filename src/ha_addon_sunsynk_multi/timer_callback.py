@@ -1,10 +1,13 @@
 """Timer class to run callbacks every x seconds."""
 
 import asyncio
+import heapq
 import logging
+import math
 import time
 from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
+from itertools import count
 
 from whenever import Time, ZonedDateTime
 
@@ -21,8 +24,12 @@ class Callback:
 
     name: str
 
-    next_run: int = 0
-    """Next run in seconds."""
+    next_run: float = 0
+    """Next run in seconds (epoch)."""
+    every: float = 0
+    """Run every <every> seconds, fractions allowed."""
+    offset: float = 0
+    """Wake up this many seconds after ``next_run``, to spread callbacks."""
 
     keep_stats: bool = False
     """Whether to keep execution time stats."""
@@ -33,7 +40,7 @@ class Callback:
     stat_error_count: int = 0
     """Number of times the callback raised an error."""
 
-    def call(self, now: int) -> None:
+    def call(self, now: float) -> None:
         """Call the callback."""
         raise NotImplementedError
 
@@ -46,11 +53,11 @@ class Callback:
 class SyncCallback(Callback):
     """A sync callback."""
 
-    every: int = 60
+    every: float = 60
     """Run every <every> seconds."""
-    callback: Callable[[int], None] = field(kw_only=True)
+    callback: Callable[[float], None] = field(kw_only=True)
 
-    def call(self, now: int) -> None:
+    def call(self, now: float) -> None:
         """Catch unhandled exceptions."""
         self.next_run = now + self.every
         try:
@@ -123,7 +130,7 @@ class ToggleLogCallback(Callback):
             for name, level in levels.items():
                 logging.getLogger(name).setLevel(level)
 
-    def call(self, now: int) -> None:
+    def call(self, now: float) -> None:
         """Toggle the log level."""
         if self.task and not self.task.done():
             self.stat_busy_count += 1
@@ -139,16 +146,16 @@ class ToggleLogCallback(Callback):
 class AsyncCallback(Callback):
     """An async callback."""
 
-    every: int = 0
+    every: float = 0
     """Run every <every> seconds."""
     task: asyncio.Task = field(init=False)
-    callback: Callable[[int], Awaitable[None]] = field(kw_only=True)
+    callback: Callable[[float], Awaitable[None]] = field(kw_only=True)
 
     def __post_init__(self) -> None:
         """Init."""
         self.task = None  # type:ignore[assignment]
 
-    async def wrap_callback(self, now: int) -> None:
+    async def wrap_callback(self, now: float) -> None:
         """Catch unhandled exceptions."""
         try:
             t_0 = time.perf_counter()
@@ -161,7 +168,7 @@ class AsyncCallback(Callback):
             self.next_run = now  # re run!
             self.stat_error_count += 1
 
-    def call(self, now: int) -> None:
+    def call(self, now: float) -> None:
         """Create the task."""
         if self.task and not self.task.done():
             self.stat_busy_count += 1
@@ -170,39 +177,55 @@ class AsyncCallback(Callback):
         self.task = asyncio.create_task(self.wrap_callback(now))
 
 
-# async def run_callbacks_old(callbacks: Sequence[Callback]) -> None:
-#     """Run the timer."""
-#     sleep_task = asyncio.create_task(asyncio.sleep(0.5))
-#     while callbacks:
-#         await sleep_task
-#         frac, nowf = modf(time.time())
-#         sleep_task = asyncio.create_task(asyncio.sleep(1.05 - frac))
-#         now = int(nowf)
-#         for cb in callbacks:
-#             slip_s = now - cb.next_run
-#             if (now + cb.offset) % cb.every != 0 and slip_s < 0:
-#                 continue
-#             if cb.keep_stats and cb.next_run > 0:
-#                 cb.stat_slip.append(abs(slip_s))
-#             cb.call(now)
+def due_time(cb: Callback, wall: float) -> float:
+    """Return the ``now`` to call a due callback with.
 
-#     await sleep_task
+    On time, this is ``next_run``. When late, skip to the latest slot of the
+    ``every`` grid, so a late callback runs once instead of catching up.
+    """
+    step = cb.every if cb.every > 0 else 1
+    late = wall - cb.next_run
+    if late < step:
+        return cb.next_run
+    return cb.next_run + step * math.floor(late / step)
 
 
 async def run_callbacks(callbacks: list[Callback]) -> None:
-    """Run the timer."""
+    """Run the timer.
+
+    Callbacks wait in a heap, ordered by their deadline on the monotonic clock,
+    and the timer sleeps until the first one is due, at most a second.
+    ``next_run`` stays in epoch seconds; callbacks added to the list, or whose
+    ``next_run`` moved since they were pushed (earlier or later, e.g. a failed
+    async callback), are pushed again at the next wake-up.
+    """
+    loop = asyncio.get_running_loop()
+    heap: list[tuple[float, int, float, Callback]] = []
+    seq = count()
+    pushed: dict[int, float] = {}  # id(cb) -> next_run of its live heap entry
+
+    def push(cb: Callback, mono: float, wall: float) -> None:
+        deadline = mono + cb.next_run + cb.offset - wall
+        pushed[id(cb)] = cb.next_run
+        heapq.heappush(heap, (deadline, next(seq), cb.next_run, cb))
+
     while True:
-        now_s = ZonedDateTime.now_in_system_tz().timestamp_millis() // 1000
+        mono, wall = loop.time(), time.time()
         for cb in callbacks:
-            if cb.next_run > now_s:
+            if pushed.get(id(cb)) != cb.next_run:
+                push(cb, mono, wall)
+
+        while heap and heap[0][0] <= mono:
+            _, _, next_run, cb = heapq.heappop(heap)
+            if pushed[id(cb)] != next_run:  # superseded by a later push
                 continue
-            cb.call(now_s)
+            now = due_time(cb, wall)
+            cb.call(now)
+            if cb.next_run <= now:  # busy or failed: retry soon
+                cb.next_run = now + min(cb.every or 1, 1)
+            push(cb, mono, wall)
 
-        end_s, ms = divmod(ZonedDateTime.now_in_system_tz().timestamp_millis(), 1000)
-        if end_s <= now_s:  # sleep remainder of the second, plus 10ms
-            await asyncio.sleep((1010 - ms) / 1000)
-        else:
-            await asyncio.sleep(0)  # yield to event loop
+        await asyncio.sleep(min(heap[0][0] - loop.time(), 1) if heap else 1)
 
 
 CALLBACKS: list[Callback] = []
@@ -24,7 +24,8 @@ class Schedule:
     key: str = ""
     """Key can be: the sensor name, class (i.e. RWSensor) and unit."""
 
-    read_every: int = 0
+    read_every: float = 0
+    """Seconds between reads, fractions allowed. 0 reads once."""
     report_every: int = 0
     change_by: float = 0
     """Significant change over last samples."""
@@ -42,15 +43,26 @@ class Schedule:
         """Read once."""
         return self.read_every == 0
 
+    @property
+    def history_size(self) -> int:
+        """Recent readings kept between reports: reads per report & slack."""
+        if not self.read_every:
+            return 2
+        return int(max(self.report_every, self.read_every) // self.read_every) + 2
+
     def significant_change(self, history: list[NumType], last: NumType) -> bool:
         """Check if there is a significant change according to the schedule."""
+        avg = sum(history) / len(history) if history else None
+        return self.is_significant(avg, last)
+
+    def is_significant(self, avg: float | None, last: NumType) -> bool:
+        """Check if ``last`` differs significantly from the history average ``avg``."""
         if self.change_any:
             raise NotImplementedError(
                 f"significant_change not applicable: schedule {self.key} uses change_any."
             )
-        if not history:
+        if avg is None:
             return False
-        avg = sum(history) / len(history)
         if self.change_by:
             if abs(last - avg) >= self.change_by:
                 return True
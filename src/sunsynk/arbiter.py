@@ -0,0 +1,204 @@
+"""Share one bus between the inverters on a port."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sunsynk.sunsynk import BusAirtime, HoldingUnit
+
+type _ReadKey = tuple[int, int, int]
+"""Unit key, address and count of a read."""
+
+
+@dataclass(slots=True)
+class _Request:
+    """A queued FC03 or FC16 request."""
+
+    key: int
+    unit: HoldingUnit
+    address: int
+    count: int
+    values: list[int] | None = None
+    """Registers to write, None for a read."""
+    started: bool = False
+    future: asyncio.Future[list[int] | None] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+@dataclass(kw_only=True)
+class BusArbiter:
+    """Queue the requests of all units on a port and send them in a fair order.
+
+    Writes go first, reads take turns per unit (round-robin), one request at a
+    time on the half-duplex bus. A read identical to one that is queued, or in
+    flight and started after the last write to that unit, shares its response.
+    """
+
+    airtime: BusAirtime | None = None
+    """Bus accounting of the port. Merged reads are only counted once."""
+
+    requests: int = 0
+    merged: int = 0
+    busy: float = 0
+    """Seconds with at least one request on the bus."""
+    queue_max: int = 0
+    since: float = field(default_factory=time.monotonic)
+
+    _reads: dict[int, deque[_Request]] = field(default_factory=dict, repr=False)
+    _writes: deque[_Request] = field(default_factory=deque, repr=False)
+    _pending: dict[_ReadKey, _Request] = field(default_factory=dict, repr=False)
+    _turn: deque[int] = field(default_factory=deque, repr=False)
+    _sending: bool = field(default=False, repr=False)
+    _busy_at: float = field(default=0, repr=False)
+    _task: asyncio.Task[None] | None = field(default=None, repr=False)
+
+    def unit(self, unit: HoldingUnit, *, key: int) -> ArbitratedUnit:
+        """Route a unit's requests through the arbiter. ``key`` is its server ID."""
+        if key not in self._reads:
+            self._reads[key] = deque()
+            self._turn.append(key)
+        return ArbitratedUnit(arbiter=self, unit=unit, key=key)
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for the bus."""
+        return len(self._writes) + sum(len(q) for q in self._reads.values())
+
+    async def submit(self, req: _Request) -> list[int] | None:
+        """Queue a request and wait for its response."""
+        if req.values is None:
+            rkey = (req.key, req.address, req.count)
+            if (same := self._pending.get(rkey)) is not None:
+                self.merged += 1
+                return await asyncio.shield(same.future)
+            self._pending[rkey] = req
+            self._reads[req.key].append(req)
+        else:
+            self._writes.append(req)
+        self.queue_max = max(self.queue_max, self.queued)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch())
+        return await asyncio.shield(req.future)
+
+    def _next(self) -> _Request | None:
+        """Pop the next request: a write, else the next unit with a queued read."""
+        if self._writes:
+            return self._writes.popleft()
+        for _ in range(len(self._turn)):
+            key = self._turn[0]
+            self._turn.rotate(-1)
+            if self._reads[key]:
+                return self._reads[key].popleft()
+        return None
+
+    async def _dispatch(self) -> None:
+        """Send queued requests one at a time, until the queue is empty."""
+        while (req := self._next()) is not None:
+            await self._send(req)
+
+    async def _send(self, req: _Request) -> None:
+        """Send one request and resolve its future."""
+        self.requests += 1
+        req.started = True
+        self._busy_at = time.monotonic()
+        self._sending = True
+        try:
+            if req.values is None:
+                res = await req.unit.read_holding_registers(req.address, req.count)
+            else:
+                await req.unit.write_registers(req.address, req.values)
+                res = None
+            self._record(req)
+        except asyncio.CancelledError:
+            req.future.cancel()
+            raise
+        except Exception as err:
+            if isinstance(err, TimeoutError):
+                self._record(req, answered=False)
+            req.future.set_exception(err)
+            # Retrieved by the waiters; avoid "exception never retrieved"
+            req.future.exception()
+        else:
+            req.future.set_result(res)
+        finally:
+            self._sending = False
+            self.busy += time.monotonic() - self._busy_at
+            if req.values is None:
+                rkey = (req.key, req.address, req.count)
+                if self._pending.get(rkey) is req:
+                    del self._pending[rkey]
+            else:
+                # Reads that started before this write must not be shared
+                for rkey, read in list(self._pending.items()):
+                    if read.key == req.key and read.started:
+                        del self._pending[rkey]
+
+    def _record(self, req: _Request, *, answered: bool = True) -> None:
+        """Account a request that went out on the bus."""
+        if self.airtime is not None:
+            fcode = 0x03 if req.values is None else 0x10
+            self.airtime.record(fcode, req.count, answered=answered)
+
+    @property
+    def utilisation(self) -> float:
+        """Fraction of the time since ``reset`` with a request on the bus."""
+        now = time.monotonic()
+        busy = self.busy + (now - self._busy_at if self._sending else 0)
+        elapsed = now - self.since
+        return busy / elapsed if elapsed > 0 else 0
+
+    def attributes(self) -> dict[str, float | int]:
+        """Attributes for the callback stats entity."""
+        return {
+            "bus_utilisation": round(self.utilisation, 3),
+            "bus_requests": self.requests,
+            "bus_merged": self.merged,
+            "bus_queue_max": self.queue_max,
+        }
+
+    def reset(self) -> None:
+        """Start a new statistics period."""
+        self.requests = self.merged = self.queue_max = 0
+        self.busy = 0
+        self.since = self._busy_at = time.monotonic()
+
+
+@dataclass(slots=True)
+class ArbitratedUnit:
+    """A ``HoldingUnit`` that sends its requests through a ``BusArbiter``."""
+
+    arbiter: BusArbiter
+    unit: HoldingUnit
+    key: int
+
+    @property
+    def connected(self) -> bool:
+        """Whether the underlying link is up."""
+        return self.unit.connected
+
+    async def read_holding_registers(self, /, address: int, count: int) -> list[int]:
+        """Read holding registers (FC03) when it is this unit's turn."""
+        res = await self.arbiter.submit(
+            _Request(key=self.key, unit=self.unit, address=address, count=count)
+        )
+        assert res is not None
+        return res
+
+    async def write_registers(self, /, address: int, values: list[int]) -> None:
+        """Write holding registers (FC16) ahead of the queued reads."""
+        await self.arbiter.submit(
+            _Request(
+                key=self.key,
+                unit=self.unit,
+                address=address,
+                count=len(values),
+                values=values,
+            )
+        )
@@ -1,7 +1,6 @@
 """Helper functions."""
 
 import logging
-import math
 import struct
 from collections.abc import Iterable
 from dataclasses import InitVar, dataclass
@@ -84,7 +83,7 @@ def int_round(val: NumType) -> NumType:
     if not isinstance(val, float):
         return val
     val = round(val, 2)
-    if math.modf(val)[0] == 0:
+    if val.is_integer():
         return int(val)
     return val
 
@@ -1,10 +1,12 @@
 """Sensor classes represent modbus registers for an inverter."""
 
 import logging
-from collections.abc import Iterable, Mapping
-from dataclasses import InitVar, dataclass, field, replace
-from statistics import mean
-from typing import Self
+import sys
+from array import array
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import InitVar, dataclass, field, fields, replace
+from functools import lru_cache
+from typing import Any, Self
 
 from sunsynk.helpers import (
     NumType,
@@ -42,9 +44,15 @@ class Sensor:
     alias: str | tuple[str, ...] | None = None
     """Alternate name(s); each is registered in ``SensorDefinitions.all`` under ``slug(name)``."""
 
+    decoder: Callable[[RegType], ValType] = field(init=False, repr=False)
+    """Compiled ``reg_to_value``, see ``compile_decoder``."""
+    _id: str = field(init=False, repr=False)
+    _hash: int = field(init=False, repr=False)
+
     def __post_init__(self, address0: RegType | int) -> None:
         """Post init."""
         self.address = ensure_tuple(address0)  # type:ignore[misc]
+        self._compile()
         if self.bitmask and len(self.address) != 1:
             _LOG.fatal(
                 "Sensors with a bitmask should reference a single register! %s [registers=%s]",
@@ -52,10 +60,16 @@ class Sensor:
                 self.address,
             )
 
+    def _compile(self) -> None:
+        """Cache the interned ID, hash and decoder. Call after changing attributes."""
+        self._id = sys.intern(slug(self.name))
+        self._hash = hash((self.address, self.name))
+        self.decoder = compile_decoder(self)
+
     @property
     def id(self) -> str:
         """Get the sensor ID."""
-        return slug(self.name)
+        return self._id
 
     @property
     def source(self) -> str:
@@ -82,6 +96,14 @@ class Sensor:
         _LOG.debug("%s=%s%s %s", self.id, val, self.unit, regs)
         return val
 
+    def new_slot(self) -> Any:
+        """Per-inverter decode state, kept by ``InverterState``. None if stateless."""
+        return None
+
+    def decode_slot(self, regs: RegType, slot: Any) -> ValType:
+        """Decode with the state from ``new_slot``."""
+        return self.reg_to_value(regs)
+
     def masked(self, regs: RegType) -> RegType:
         """Return the masked reg."""
         if self.bitmask:
@@ -89,14 +111,54 @@ class Sensor:
         return regs
 
     def __hash__(self) -> int:
-        """Hash the sensor id."""
-        return hash((self.address, self.name))
+        """Hash the sensor address and name."""
+        return self._hash
 
     def __eq__(self, other: object) -> bool:
         """Sensor equality is based on the ID only."""
         if not isinstance(other, Sensor):
             raise TypeError(str(type(other)))
-        return self.id == other.id
+        return self._id is other._id or self._id == other._id
+
+
+def compile_decoder(sensor: Sensor) -> Callable[[RegType], ValType]:
+    """Compile the decoder of a sensor, the same as its ``reg_to_value``.
+
+    Plain ``Sensor`` instances of 1 or 2 registers get a specialised function,
+    with the mask, sign and scale baked in; subclasses keep their own.
+    """
+    size = len(sensor.address)
+    if type(sensor) is not Sensor or size not in (1, 2):
+        return sensor.reg_to_value
+
+    mask, scale = sensor.bitmask or 0xFFFF, abs(sensor.factor)
+    bits = 16 * size
+    sign, wrap = 1 << (bits - 1), 1 << bits
+
+    if size == 1:
+
+        def _raw(regs: RegType) -> int:
+            return regs[0] & mask
+
+    else:
+
+        def _raw(regs: RegType) -> int:
+            return (regs[0] & mask) | (regs[1] & mask) << 16
+
+    if sensor.factor < 0:
+        unsigned = _raw
+
+        def _raw(regs: RegType) -> int:
+            val = unsigned(regs)
+            return val - wrap if val & sign else val
+
+    if scale == 1:
+        return _raw
+
+    def _decode(regs: RegType) -> ValType:
+        return int_round(float(_raw(regs)) * scale)
+
+    return _decode
 
 
 @dataclass(slots=True, eq=False)
@@ -116,27 +178,70 @@ class Constant(Sensor):
         return self.value
 
 
+class Sensor16Window:
+    """The last readings of a ``Sensor16``: a ring with a running sum and zero count."""
+
+    __slots__ = ("_pos", "_reg0", "_reg1", "count", "sum0", "zeros1")
+
+    def __init__(self, size: int = 10) -> None:
+        """Allocate the ring."""
+        self._reg0 = array("H", bytes(2 * size))
+        self._reg1 = array("H", bytes(2 * size))
+        self._pos = 0
+        self.count = 0
+        self.sum0 = 0
+        """Sum of reg[0] in the window."""
+        self.zeros1 = 0
+        """Readings in the window where reg[1] is 0."""
+
+    def push(self, reg0: int, reg1: int) -> None:
+        """Add a reading, dropping the oldest when full."""
+        pos = self._pos
+        if self.count == len(self._reg0):
+            self.sum0 -= self._reg0[pos]
+            self.zeros1 -= self._reg1[pos] == 0
+        else:
+            self.count += 1
+        self._reg0[pos] = reg0
+        self._reg1[pos] = reg1
+        self.sum0 += reg0
+        self.zeros1 += reg1 == 0
+        self._pos = (pos + 1) % len(self._reg0)
+
+    @property
+    def mean0(self) -> float:
+        """Mean of reg[0] in the window."""
+        return self.sum0 / self.count if self.count else 0.0
+
+
 @dataclass(slots=True, eq=False)
 class Sensor16(Sensor):
     """Sensor with a 16-bit/32-bit register registers."""
 
-    history1: list[int] = field(default_factory=list)
-    """History of reg[1]. If last 10 are all > 0, unpack as 32-bit, else only 16-bit."""
-    history0: list[int] = field(default_factory=list)
+    window: Sensor16Window = field(
+        default_factory=Sensor16Window, init=False, repr=False
+    )
+    """Recent readings, when decoded without an ``InverterState``."""
+
+    def new_slot(self) -> Sensor16Window:
+        """Recent readings, per inverter."""
+        return Sensor16Window()
 
     def reg_to_value(self, regs: RegType) -> ValType:
         """Return the value from the registers."""
+        return self.decode_slot(regs, self.window)
+
+    def decode_slot(self, regs: RegType, slot: Sensor16Window) -> ValType:
+        """Return the value from the registers.
+
+        If reg[1] was 0 in the last 10 readings, unpack as 16-bit, else 32-bit.
+        """
         regs = self.masked(regs)
-        self.history1.append(regs[1])
-        self.history0.append(regs[0])
-        if len(self.history1) > 10:
-            self.history1.pop(0)
-            self.history0.pop(0)
-        # _LOG.debug("%s %s", hex_str(regs), mean(self.history0))
+        slot.push(regs[0], regs[1])
         if (
-            any(r == 0 for r in self.history1)  # reg[1] between negative and positive
+            slot.zeros1  # reg[1] between negative and positive
             or (  # a big drop in reg[0] could also be close to a neg to pos transition
-                regs[1] == 0xFFFF and mean(self.history0) - regs[0] > 10000
+                regs[1] == 0xFFFF and slot.mean0 - regs[0] > 10000
             )
         ):
             regs = (regs[0],)
@@ -226,9 +331,24 @@ class SensorDefinitions:
                         conflicts.append((addr, a, b, overlap))
         return conflicts
 
-    def override(self, values: dict[str, int | float]) -> None:
+    def override(self, values: dict[str, Any]) -> None:
         """Override existing sensors with new definitions."""
         new_sensors = dict[str, Sensor]()
+        refs: dict[str, list[tuple[str, str]]] | None = None
+
+        def _referrers(sid: str) -> list[tuple[str, str]]:
+            """Sensor IDs and attributes referencing ``sid``, indexed on first use."""
+            nonlocal refs
+            if refs is None:
+                refs = {}
+                for key, sen in self.all.items():
+                    if key != sen.id:
+                        continue  # alias
+                    for fld in fields(sen):
+                        cur = getattr(sen, fld.name, None)
+                        if isinstance(cur, Sensor):
+                            refs.setdefault(cur.id, []).append((key, fld.name))
+            return refs.get(sid, [])
 
         def _copy(old: Sensor) -> Sensor:
             sid = old.id
@@ -237,11 +357,8 @@ class SensorDefinitions:
             news = self.all[sid] = new_sensors[sid] = replace(old, address0=old.address)
 
             # replace all references
-            for sen in self.all.values():
-                for attrn in dir(sen):
-                    cur = getattr(sen, attrn, None)
-                    if isinstance(cur, Sensor) and old == cur:
-                        setattr(_copy(sen), attrn, news)
+            for ref, attrn in _referrers(sid):
+                setattr(_copy(self.all[ref]), attrn, news)
             return news
 
         info: list[dict[str, str]] = []
@@ -272,7 +389,9 @@ class SensorDefinitions:
                 row["Message"] = "✕ Attribute not found on target sensor"
                 continue
 
-            setattr(_copy(sen), sen_attr, val)
+            target = _copy(sen)
+            setattr(target, sen_attr, val)
+            target._compile()
             row["Message"] = f"✓ {getattr(sen, sen_attr, '?')} -> {val}"
 
         tab = pretty_table(*table_data(info))
@@ -387,16 +506,129 @@ class TempSensor(Sensor):
         return None
 
 
+_FAULTS = {
+    13: "Working mode change",
+    18: "AC over current",
+    20: "DC over current",
+    23: "AC leak current or transient over current",
+    24: "DC insulation impedance",
+    26: "DC busbar imbalanced",
+    29: "Parallel comms cable",
+    35: "No AC grid",
+    42: "AC line low voltage",
+    47: "AC freq high/low",
+    56: "DC busbar voltage low",
+    63: "ARC fault",
+    64: "Heat sink tempfailure",
+}
+"""Fault descriptions by fault number (F01 is bit 0 of the first register)."""
+
+_HV_FAULTS = {
+    1: "DC Inversed Failure",
+    2: "DC insula�on impedance permanent fault",
+    3: "DC leakage current fault",
+    4: "Ground fault GFDI",
+    5: "Read the memory error",
+    6: "Write the memory error",
+    7: "DC START Failure",
+    8: "GFDI grounding touch failure",
+    9: "IGBT damaged by excessive drop voltage",
+    10: "Auxiliary power supply failure",
+    11: "AC main contactor errors",
+    12: "AC auxiliary contactor errors",
+    13: "Working mode change",
+    14: "DC over current SW Failure",
+    15: "AC over current SW Failure",
+    16: "DC Ground Leakage current fault",
+    18: "AC over current TZ",
+    19: "All hardware failure synthesis",
+    20: "DC over current",
+    21: "DC HV Bus over current",
+    22: "Remote Emergency stop",
+    23: "AC leakage current is transient over current",
+    24: "DC insulation impedance",
+    25: "DC feedback fault",
+    26: "DC busbar imbalanced",
+    27: "DC end insula�on error",
+    28: "Inverter 1 DC high fault",
+    29: "Parallel comms cable/AC load switch failure",
+    30: "AC main contactor failure",
+    31: "Relay open circuit fault",
+    32: "Inverter 2 dc high fault",
+    33: "AC Overcurrent",
+    34: "AC Overload (backup)",
+    35: "No AC grid",
+    36: "AC grid phase error",
+    37: "AC three-phase voltage unbalance failure",
+    38: "AC three-phase current unbalance failure",
+    39: "AC over current (one cycle)",
+    40: "DC over current",
+    41: "Parallel system stopped",
+    42: "AC line low voltage",
+    43: "AC Line V,W over voltage",
+    44: "AC Line V,W low voltage",
+    45: "AC Line U,V over voltage",
+    46: "Battery 1 fault",
+    47: "AC grid freq too high",
+    48: "AC grid freq too low",
+    49: "Battery 2 fault",
+    50: "V phase grid current DC component over current",
+    51: "W phase grid current DC component over current",
+    52: "DC voltage too high",
+    53: "DC voltage too low",
+    54: "battery 1 voltage high",
+    55: "battery 2 voltage high",
+    56: "battery 1 voltage low",
+    57: "battery 2 voltage low",
+    58: "bms communication lost",
+    59: "AC grid V over current",
+    60: "AC grid W over current",
+    61: "Reactor A phase over current",
+    62: "DRM stop activated",
+    63: "ARC fault",
+    64: "Heat sink tempfailure",
+}
+"""HV inverter fault descriptions by fault number."""
+
+_SD_STATUS = {1000: "fault", 2000: "ok"}
+
+_INVERTER_STATES = {
+    0: "standby",
+    1: "selfcheck",
+    2: "ok",
+    3: "alarm",
+    4: "fault",
+    5: "activating",
+}
+
+
+def _fault_decoder(faults: Mapping[int, str]) -> Callable[[RegType], str]:
+    """Memoized fault word decoder. Fault registers only take a few values."""
+
+    @lru_cache(maxsize=256)
+    def _decode(regs: RegType) -> str:
+        err = []
+        for idx, b16 in enumerate(regs):
+            off = idx * 16 + 1
+            for bit in range(16):
+                if (1 << bit) & b16:
+                    err.append(f"F{bit + off:02} {faults.get(bit + off, '')}".strip())
+        return ", ".join(err)
+
+    return _decode
+
+
+_decode_faults = _fault_decoder(_FAULTS)
+_decode_hv_faults = _fault_decoder(_HV_FAULTS)
+
+
 @dataclass(slots=True, eq=False)
 class SDStatusSensor(TextSensor):
     """SD card status."""
 
     def reg_to_value(self, regs: RegType) -> ValType:
         """Decode the SD card status."""
-        return {
-            1000: "fault",
-            2000: "ok",
-        }.get(regs[0]) or f"unknown {regs[0]}"
+        return _SD_STATUS.get(regs[0]) or f"unknown {regs[0]}"
 
 
 @dataclass(slots=True, eq=False)
@@ -405,14 +637,7 @@ class InverterStateSensor(TextSensor):
 
     def reg_to_value(self, regs: RegType) -> ValType:
         """Decode the inverter status."""
-        return {
-            0: "standby",
-            1: "selfcheck",
-            2: "ok",
-            3: "alarm",
-            4: "fault",
-            5: "activating",
-        }.get(regs[0]) or f"unknown {regs[0]}"
+        return _INVERTER_STATES.get(regs[0]) or f"unknown {regs[0]}"
 
 
 @dataclass(slots=True, eq=False)
@@ -424,6 +649,13 @@ class SerialSensor(Sensor):
         return "".join(chr(b16 >> 8) + chr(b16 & 0xFF) for b16 in regs)
 
 
+@dataclass(slots=True)
+class EnumWarning:
+    """Whether to warn about the next unknown ``EnumSensor`` value."""
+
+    warn: bool = True
+
+
 @dataclass(slots=True, eq=False)
 class EnumSensor(TextSensor):
     """Sensor with a set of enum values. Like a read-only SelectRWSensor."""
@@ -431,13 +663,21 @@ class EnumSensor(TextSensor):
     options: dict[int, str] = field(default_factory=dict)
     unknown: str | None = None
     """Unknown value format string. Default to none, can include the register value as {}."""
-    _warn: bool = True
+    _warning: EnumWarning = field(default_factory=EnumWarning, init=False, repr=False)
 
     def available_values(self) -> list[str]:
         """Get the available values for this sensor."""
         return list(self.options.values())
 
+    def new_slot(self) -> EnumWarning:
+        """Warn about unknown values once per inverter."""
+        return EnumWarning()
+
     def reg_to_value(self, regs: RegType) -> ValType:
+        """Decode the register."""
+        return self.decode_slot(regs, self._warning)
+
+    def decode_slot(self, regs: RegType, slot: EnumWarning) -> ValType:
         """Decode the register."""
         regsm = self.masked(regs)
         res = self.options.get(regsm[0])
@@ -447,16 +687,16 @@ class EnumSensor(TextSensor):
             url = (
                 "https://github.com/kellerza/sunsynk/tree/main/src/sunsynk/definitions"
             )
-            if self._warn:
+            if slot.warn:
                 _LOG.warning(
                     "%s: Unknown register value %s. Consider extending the definition with a PR. %s",
                     self.id,
                     hex(regsm[0]),
                     url,
                 )
-            self._warn = False
+            slot.warn = False
             return None
-        self._warn = True
+        slot.warn = True
         return res
 
 
@@ -466,31 +706,7 @@ class FaultSensor(TextSensor):
 
     def reg_to_value(self, regs: RegType) -> ValType:
         """Decode Inverter faults."""
-        faults = {
-            13: "Working mode change",
-            18: "AC over current",
-            20: "DC over current",
-            23: "AC leak current or transient over current",
-            24: "DC insulation impedance",
-            26: "DC busbar imbalanced",
-            29: "Parallel comms cable",
-            35: "No AC grid",
-            42: "AC line low voltage",
-            47: "AC freq high/low",
-            56: "DC busbar voltage low",
-            63: "ARC fault",
-            64: "Heat sink tempfailure",
-        }
-        err = []
-        off = 0
-        for b16 in regs:
-            for bit in range(16):
-                msk = 1 << bit
-                if msk & b16:
-                    msg = f"F{bit + off + 1:02} " + faults.get(bit + off + 1, "")
-                    err.append(msg.strip())
-            off += 16
-        return ", ".join(err)
+        return _decode_faults(tuple(regs))
 
 
 @dataclass(slots=True, eq=False)
@@ -499,81 +715,7 @@ class HVFaultSensor(TextSensor):
 
     def reg_to_value(self, regs: RegType) -> ValType:
         """Decode HV Inverter faults."""
-        faults = {
-            1: "DC Inversed Failure",
-            2: "DC insula�on impedance permanent fault",
-            3: "DC leakage current fault",
-            4: "Ground fault GFDI",
-            5: "Read the memory error",
-            6: "Write the memory error",
-            7: "DC START Failure",
-            8: "GFDI grounding touch failure",
-            9: "IGBT damaged by excessive drop voltage",
-            10: "Auxiliary power supply failure",
-            11: "AC main contactor errors",
-            12: "AC auxiliary contactor errors",
-            13: "Working mode change",
-            14: "DC over current SW Failure",
-            15: "AC over current SW Failure",
-            16: "DC Ground Leakage current fault",
-            18: "AC over current TZ",
-            19: "All hardware failure synthesis",
-            20: "DC over current",
-            21: "DC HV Bus over current",
-            22: "Remote Emergency stop",
-            23: "AC leakage current is transient over current",
-            24: "DC insulation impedance",
-            25: "DC feedback fault",
-            26: "DC busbar imbalanced",
-            27: "DC end insula�on error",
-            28: "Inverter 1 DC high fault",
-            29: "Parallel comms cable/AC load switch failure",
-            30: "AC main contactor failure",
-            31: "Relay open circuit fault",
-            32: "Inverter 2 dc high fault",
-            33: "AC Overcurrent",
-            34: "AC Overload (backup)",
-            35: "No AC grid",
-            36: "AC grid phase error",
-            37: "AC three-phase voltage unbalance failure",
-            38: "AC three-phase current unbalance failure",
-            39: "AC over current (one cycle)",
-            40: "DC over current",
-            41: "Parallel system stopped",
-            42: "AC line low voltage",
-            43: "AC Line V,W over voltage",
-            44: "AC Line V,W low voltage",
-            45: "AC Line U,V over voltage",
-            46: "Battery 1 fault",
-            47: "AC grid freq too high",
-            48: "AC grid freq too low",
-            49: "Battery 2 fault",
-            50: "V phase grid current DC component over current",
-            51: "W phase grid current DC component over current",
-            52: "DC voltage too high",
-            53: "DC voltage too low",
-            54: "battery 1 voltage high",
-            55: "battery 2 voltage high",
-            56: "battery 1 voltage low",
-            57: "battery 2 voltage low",
-            58: "bms communication lost",
-            59: "AC grid V over current",
-            60: "AC grid W over current",
-            61: "Reactor A phase over current",
-            62: "DRM stop activated",
-            63: "ARC fault",
-            64: "Heat sink tempfailure",
-        }
-        err = []
-        off = 0
-        for b16 in regs:
-            for bit in range(16):
-                msk = 1 << bit
-                if msk & b16:
-                    msg = f"F{bit + off + 1:02} " + faults.get(off + bit + 1, "")
-                    err.append(msg.strip())
-            off += 16
-        return ", ".join(err)
+        return _decode_hv_faults(tuple(regs))
 
 
 @dataclass(slots=True, eq=False)
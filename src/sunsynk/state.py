@@ -1,17 +1,36 @@
 """Register state."""
 
 import logging
+import math
+import struct
+import sys
+from array import array
 from collections import defaultdict
 from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
-from typing import cast
+from functools import lru_cache
+from typing import Any, cast
 
-from sunsynk.helpers import NumType, as_num, hex_str
+from sunsynk.helpers import NumType, RegType, as_num, hex_str
 from sunsynk.rwsensors import RWSensor
-from sunsynk.sensors import LOG_TRACE, BinarySensor, Constant, Sensor, ValType
+from sunsynk.sensors import (
+    LOG_TRACE,
+    BinarySensor,
+    Constant,
+    Sensor,
+    ValType,
+)
+from sunsynk.utils import History
 
 _LOG = logging.getLogger(__name__)
 
+HISTORY_SIZE = 60
+"""Default numeric history capacity for sensors without a schedule."""
+
+SNAPSHOT_HEADER = struct.Struct("<4sH")
+"""Snapshot magic and register count, followed by the addresses and values."""
+SNAPSHOT_MAGIC = b"SSR1"
+
 
 @dataclass
 class InverterState:
@@ -20,15 +39,33 @@ class InverterState:
     values: dict[Sensor, ValType] = field(default_factory=dict)
     registers: dict[int, int] = field(default_factory=dict)
     onchange: Callable[[Sensor, ValType, ValType], None] | None = None
-    history: dict[Sensor, list[NumType]] = field(init=False)
+    history: dict[Sensor, History] = field(init=False)
     """Historic values for numeric types."""
     historynn: dict[Sensor, list[ValType]] = field(init=False)
-    """Historic values for non-numeric types."""
+    """Historic values for non-numeric types: [previous, last]."""
+    history_size: dict[Sensor, int] = field(init=False)
+    """Recent readings kept per sensor, default ``HISTORY_SIZE``."""
+    by_address: dict[int, list[Sensor]] = field(init=False)
+    """Reverse index of register address to the tracked sensors that read it."""
+    decoded: dict[Sensor, RegType] = field(init=False, repr=False)
+    """Registers (after bitmask) of the last decode, to skip unchanged sensors."""
+    index: dict[Sensor, int] = field(init=False, repr=False)
+    """Index of each tracked sensor in ``slots``."""
+    slots: list[Any] = field(init=False, repr=False)
+    """Per-inverter decode state (``Sensor.new_slot``), so definitions can be shared."""
+    stale: set[Sensor] = field(init=False)
+    """Sensors with a value from ``restore`` that has not been read since."""
 
     def __post_init__(self) -> None:
         """Post init."""
         self.historynn = defaultdict(list)
-        self.history = defaultdict(list)
+        self.history = {}
+        self.history_size = {}
+        self.by_address = defaultdict(list)
+        self.decoded = {}
+        self.index = {}
+        self.slots = []
+        self.stale = set()
 
     def __getitem__(self, sensor: Sensor) -> ValType:
         """Get the current value of a sensor."""
@@ -40,13 +77,28 @@ class InverterState:
             return as_num(sensor.value)
         return self.values.get(sensor, default)
 
-    def track(self, *sensor: Sensor) -> None:
-        """Add a sensor to be tracked."""
+    def track(self, *sensor: Sensor, history_size: int = 0) -> None:
+        """Add a sensor to be tracked.
+
+        ``history_size`` sets the numeric history capacity (see ``Schedule.history_size``).
+        """
         for sen in sensor:
-            self.values.setdefault(sen, None)
+            self._track(sen)
+            if history_size:
+                self.history_size[sen] = history_size
             if isinstance(sen, RWSensor) and sen.dependencies:
                 for dep in sen.dependencies:
-                    self.values.setdefault(dep, None)
+                    self._track(dep)
+
+    def _track(self, sen: Sensor) -> None:
+        """Track a single sensor and index its registers."""
+        if sen in self.values:
+            return
+        self.values[sen] = None
+        self.index[sen] = len(self.slots)
+        self.slots.append(sen.new_slot())
+        for adr in sen.address:
+            self.by_address[adr].append(sen)
 
     @property
     def sensors(self) -> Iterator[Sensor]:
@@ -70,23 +122,45 @@ class InverterState:
         """Update the state."""
         changed: dict[Sensor, tuple[ValType, ValType]] = {}  # sensor, old & new value
 
-        for sen in self.sensors:
-            # No updates for this sensor, skip
-            if not any(a in new_regs for a in sen.address):
-                continue
+        # Only decode sensors with at least one register in this update
+        affected = dict.fromkeys(
+            sen
+            for adr in new_regs
+            if adr in self.by_address
+            for sen in self.by_address[adr]
+        )
+
+        self.stale.difference_update(affected)
 
+        new_values: dict[Sensor, tuple[RegType, ValType]] = {}  # sensor, regs & value
+        for sen in affected:
             regs = tuple(new_regs.get(a, self.registers.get(a, 0)) for a in sen.address)
 
             assert isinstance(regs, tuple)
             assert isinstance(sen.address, tuple)
             assert len(regs) == len(sen.address)
 
-            oldv = self.values[sen]
             if sen.bitmask:
                 regs = (regs[0] & sen.bitmask,)
 
-            newv = sen.reg_to_value(regs)
+            # Stateful decoders (e.g. the Sensor16 window) see every reading.
+            slot = self.slots[self.index[sen]]
+            if slot is not None:
+                new_values[sen] = (regs, sen.decode_slot(regs, slot))
+                continue
+
+            # Same registers as the last decode: reuse the value.
+            oldv = self.values[sen]
+            new_values[sen] = (regs, oldv)
+            if oldv is not None and self.decoded.get(sen) == regs:
+                continue
+            newv = sen.decoder(regs)
+            new_values[sen] = (regs, newv)
+            self.decoded[sen] = regs
             _LOG.debug("register %s = %s (old=%s)", sen.address, oldv, newv)
+
+        for sen, (regs, newv) in new_values.items():
+            oldv = self.values[sen]
             if oldv != newv:
                 self.values[sen] = newv
                 changed[sen] = (newv, oldv)
@@ -103,13 +177,14 @@ class InverterState:
                 and sen not in self.historynn
             )
             if numeric:
-                self.history[sen].append(cast(NumType, newv))
+                if (hist := self.history.get(sen)) is None:
+                    size = self.history_size.get(sen, HISTORY_SIZE)
+                    hist = self.history[sen] = History(size)
+                hist.append(cast(NumType, newv))
+            elif hist_nn := self.historynn.get(sen):
+                hist_nn[0], hist_nn[-1] = hist_nn[-1], newv
             else:
-                if sen not in self.historynn:
-                    self.historynn[sen] = [None]
-                self.historynn[sen].append(newv)
-                while len(self.historynn[sen]) > 2:
-                    self.historynn[sen].pop(0)
+                self.historynn[sen] = [None, newv]
 
         self.registers.update(new_regs)
 
@@ -117,14 +192,58 @@ class InverterState:
             if self.onchange is not None:
                 self.onchange(sen, new, old)
 
+    def snapshot(self) -> bytes:
+        """Pack the registers of the tracked sensors, for ``restore``.
+
+        A header, then the sorted addresses and their values as little-endian
+        16-bit arrays.
+        """
+        addrs = array("H", sorted(a for a in self.registers if a in self.by_address))
+        regs = array("H", (self.registers[a] & 0xFFFF for a in addrs))
+        if sys.byteorder == "big":
+            addrs.byteswap()
+            regs.byteswap()
+        return (
+            SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(addrs))
+            + addrs.tobytes()
+            + regs.tobytes()
+        )
+
+    def restore(self, data: bytes) -> set[Sensor]:
+        """Load registers from a ``snapshot``. Return the sensors that were set.
+
+        These sensors are ``stale`` until their registers are read again.
+        """
+        size = SNAPSHOT_HEADER.size
+        if len(data) < size:
+            raise ValueError("Register snapshot too short")
+        magic, count = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or len(data) != size + 4 * count:
+            raise ValueError("Invalid register snapshot")
+        addrs = array("H", data[size : size + 2 * count])
+        regs = array("H", data[size + 2 * count :])
+        if sys.byteorder == "big":
+            addrs.byteswap()
+            regs.byteswap()
+
+        new_regs = {
+            a: r for a, r in zip(addrs, regs, strict=True) if a in self.by_address
+        }
+        self.update(new_regs)
+        restored = {sen for adr in new_regs for sen in self.by_address[adr]}
+        self.stale |= restored
+        return restored
+
     def history_average(self, sensor: Sensor) -> NumType:
-        """Return the average of the history."""
-        hist0, *hist = self.history[sensor]  # raises ValueError if no history
+        """Return the average of the history, excluding the previous average."""
+        hist = self.history.get(sensor)
         if not hist:
-            return hist0
-        res = sum(hist) / len(hist)
-        self.history[sensor].clear()
-        self.history[sensor].append(res)
+            raise ValueError(f"No history for {sensor.id}")
+        if len(hist) == 1:
+            return hist[0]
+        res = (hist.total - hist.first) / (len(hist) - 1)
+        hist.clear()
+        hist.append(res)
         return res
 
 
@@ -147,6 +266,54 @@ def group_sensors(
         yield group
 
 
+def plan_groups(
+    sensors: Iterable[Sensor],
+    request_cost: float,
+    register_cost: float = 1,
+    max_group_size: int = 60,
+) -> list[list[int]]:
+    """Group sensor registers into the cheapest set of blocks for reading.
+
+    Each block costs ``request_cost`` plus ``register_cost`` per register read,
+    including unused registers in gaps. Unlike ``group_sensors``' fixed gap,
+    this reads a gap when it is cheaper than another request.
+    """
+    if not sensors:
+        return []
+    addrs = tuple(sorted({r for s in sensors for r in s.address}))
+    plan = _plan(addrs, request_cost, register_cost, max_group_size)
+    return [list(addrs[i:j]) for i, j in plan]
+
+
+@lru_cache(maxsize=64)
+def _plan(
+    addrs: tuple[int, ...],
+    request_cost: float,
+    register_cost: float,
+    max_group_size: int,
+) -> tuple[tuple[int, int], ...]:
+    """Minimal cost blocks over sorted addresses, as (start, end) index slices."""
+    # best[k]: cost to read addrs[:k]; start[k]: where the block ending at k-1 starts
+    best = [0.0] * (len(addrs) + 1)
+    start = [0] * (len(addrs) + 1)
+    for end, last in enumerate(addrs, 1):
+        best[end] = math.inf
+        for first in range(end - 1, -1, -1):
+            span = last - addrs[first] + 1
+            if span > max_group_size:
+                break
+            cost = best[first] + request_cost + register_cost * span
+            if cost < best[end]:
+                best[end], start[end] = cost, first
+
+    plan: list[tuple[int, int]] = []
+    end = len(addrs)
+    while end:
+        plan.append((start[end], end))
+        end = start[end]
+    return tuple(reversed(plan))
+
+
 def register_map(start: int, registers: Sequence[int]) -> dict[int, int]:
     """Turn the registers into a dictionary or map."""
     return dict(enumerate(registers, start))
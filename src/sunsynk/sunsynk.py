@@ -11,11 +11,12 @@ from typing import Protocol, cast, runtime_checkable
 
 from modbus_connection import ModbusSerialParams, ModbusTimeoutError
 
+from sunsynk.arbiter import ArbitratedUnit
 from sunsynk.connection import ModbusConnection, open_connection
 from sunsynk.helpers import hex_str, patch_bitmask
 from sunsynk.rwsensors import RWSensor
 from sunsynk.sensors import LOG_TRACE, Sensor, ValType
-from sunsynk.state import InverterState, group_sensors, register_map
+from sunsynk.state import InverterState, group_sensors, plan_groups, register_map
 
 _LOG = logging.getLogger(__name__)
 
@@ -45,6 +46,158 @@ class HoldingUnit(Protocol):
         ...
 
 
+@dataclass(slots=True)
+class GroupStat:
+    """Read statistics for one register group length."""
+
+    count: int = 0
+    timeouts: int = 0
+    latency: float = 0
+    """Moving average of successful reads, in seconds."""
+
+
+@dataclass(kw_only=True)
+class BatchTuner:
+    """Learn the register group size of a port from read latency and timeouts.
+
+    Grow by one register after ``grow_after`` successful reads close to the
+    current size; halve below a group that timed out. The shortest length that
+    timed out becomes a ceiling, probed again only after ten times as many
+    successful reads.
+    """
+
+    size: int
+    min_size: int = 4
+    max_size: int = 100
+    grow_after: int = 20
+    stats: dict[int, GroupStat] = field(default_factory=dict)
+    ceiling: int = 0
+    """Shortest group length that timed out (0 = none)."""
+    _streak: int = field(default=0, repr=False)
+
+    def record(self, length: int, seconds: float | None) -> None:
+        """Record a group read. ``seconds`` is None when the attempt timed out."""
+        stat = self.stats.get(length)
+        if stat is None:
+            stat = self.stats[length] = GroupStat()
+        stat.count += 1
+
+        if seconds is None:
+            stat.timeouts += 1
+            self._streak = 0
+            if self.ceiling == 0 or length < self.ceiling:
+                self.ceiling = length
+            if length > self.min_size:
+                self.size = max(self.min_size, min(self.size, length // 2))
+            return
+
+        ok = stat.count - stat.timeouts
+        stat.latency = seconds if ok == 1 else 0.9 * stat.latency + 0.1 * seconds
+
+        if length * 4 < self.size * 3:  # only reads close to the size count
+            return
+        self._streak += 1
+        needed = self.grow_after
+        if self.ceiling and self.size + 1 >= self.ceiling:
+            needed *= 10
+        if self._streak < needed:
+            return
+        self._streak = 0
+        self.size = min(self.size + 1, self.max_size)
+        if self.size >= self.ceiling:
+            self.ceiling = 0
+
+    @property
+    def request_cost(self) -> float | None:
+        """Measured fixed cost of a request in registers (latency = a + b * length)."""
+        points = [(n, s.latency) for n, s in self.stats.items() if s.count > s.timeouts]
+        if len(points) < 2:
+            return None
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        var = sum((x - mean_x) ** 2 for x, _ in points)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+        if slope <= 0:
+            return None
+        return max(0.0, (mean_y - slope * mean_x) / slope)
+
+    def attributes(self) -> dict[str, float | int]:
+        """Learned values, for the callback stats."""
+        count = sum(s.count for s in self.stats.values())
+        timeouts = sum(s.timeouts for s in self.stats.values())
+        cost = self.request_cost
+        return {
+            "batch_size": self.size,
+            "batch_ceiling": self.ceiling,
+            "timeout_rate": round(timeouts / count, 3) if count else 0.0,
+            "request_cost": round(cost, 1) if cost is not None else -1,
+        }
+
+
+RTU_CHAR_BITS = 11
+"""Bits per RTU character: start, 8 data, parity (or a second stop) and stop."""
+
+
+def rtu_bytes(fcode: int, count: int) -> tuple[int, int]:
+    """Request and response bytes of an RTU FC03 or FC16 exchange."""
+    if fcode == 0x03:
+        return 8, 5 + 2 * count
+    return 9 + 2 * count, 8
+
+
+@dataclass(kw_only=True)
+class BusAirtime:
+    """Bytes on the RS485 bus of a port, and the share of time they take.
+
+    Counts the RTU frames between the inverter and its Modbus master, also
+    behind a TCP gateway or Solarman dongle, at ``baudrate``.
+    """
+
+    baudrate: int = 9600
+    spacing: float = 0
+    """Pause after each response, in seconds."""
+    requests: int = 0
+    tx_bytes: int = 0
+    rx_bytes: int = 0
+    since: float = field(default_factory=time.monotonic)
+
+    def airtime(self, nbytes: float, frames: int) -> float:
+        """Seconds on the wire, with a 3.5 character gap per frame."""
+        return (nbytes + 3.5 * frames) * RTU_CHAR_BITS / self.baudrate
+
+    def request_time(self, fcode: int, count: int) -> float:
+        """Bus time of one request, its response and the spacing."""
+        return self.airtime(sum(rtu_bytes(fcode, count)), 2) + self.spacing
+
+    def record(self, fcode: int, count: int, *, answered: bool = True) -> None:
+        """Record a request, and its response unless it timed out."""
+        req, res = rtu_bytes(fcode, count)
+        self.requests += 1
+        self.tx_bytes += req
+        if answered:
+            self.rx_bytes += res
+
+    def attributes(self) -> dict[str, float | int]:
+        """Share of the time since ``reset``, for the callback stats."""
+        elapsed = time.monotonic() - self.since
+        air = self.airtime(self.tx_bytes + self.rx_bytes, 2 * self.requests)
+        space = self.requests * self.spacing
+        if elapsed <= 0:
+            elapsed = air + space or 1
+        return {
+            "bus_tx_bytes": self.tx_bytes,
+            "bus_rx_bytes": self.rx_bytes,
+            "bus_airtime": round(air / elapsed, 3),
+            "bus_spacing": round(space / elapsed, 3),
+            "bus_idle": round(max(0, 1 - (air + space) / elapsed), 3),
+        }
+
+    def reset(self) -> None:
+        """Start a new statistics period."""
+        self.requests = self.tx_bytes = self.rx_bytes = 0
+        self.since = time.monotonic()
+
+
 @dataclass(kw_only=True)
 class Sunsynk:
     """Sunsync inverter reached through a holding-register unit."""
@@ -60,7 +213,18 @@ class Sunsynk:
     read_attempts: int = 3
     read_sensors_batch_size: int = 20
     allow_gap: int = 2
+    request_cost: float = 0
+    """Fixed cost of one read request, in registers. 0 groups with ``allow_gap``."""
+    tuner: BatchTuner | None = None
+    """Learns the batch size online, replacing ``read_sensors_batch_size``."""
+    airtime: BusAirtime | None = None
+    """Bus accounting of the port, shared by its inverters."""
     timeouts: int = 0
+    rtt: float = 0
+    """Moving average round trip of successful reads, in seconds."""
+    _plans: dict[tuple, list[list[int]]] = field(
+        default_factory=dict, init=False, repr=False
+    )
 
     @classmethod
     def from_url(
@@ -114,15 +278,22 @@ class Sunsynk:
                 err,
             )
 
+    def _record(self, fcode: int, count: int, *, answered: bool = True) -> None:
+        """Account a request on the bus, unless the arbiter of the port does."""
+        if self.airtime is not None and not isinstance(self.unit, ArbitratedUnit):
+            self.airtime.record(fcode, count, answered=answered)
+
     async def write_register(self, *, address: int, value: int) -> bool:
         """Write to a register - Sunsynk support function code 0x10."""
         for _ in range(self.read_attempts):
             try:
                 await self.unit.write_registers(address, [value])
+                self._record(0x10, 1)
                 return True
             except TimeoutError:
                 _LOG.warning("timeout writing register %s=%s", address, value)
                 self.timeouts += 1
+                self._record(0x10, 1, answered=False)
             except Exception as err:
                 _LOG.error("failed to write register %s=%s: %s", address, value, err)
                 await self._flush_modbus_connection(reason=type(err).__name__)
@@ -163,9 +334,19 @@ class Sunsynk:
         errs: list[Exception] = []
         for attempt in range(self.read_attempts):
             try:
-                return await self.unit.read_holding_registers(start, length)
+                perf = time.perf_counter()
+                res = await self.unit.read_holding_registers(start, length)
+                perf = time.perf_counter() - perf
+                self.rtt += (perf - self.rtt) * (0.2 if self.rtt else 1)
+                if self.tuner is not None:
+                    self.tuner.record(length, perf)
+                self._record(0x03, length)
+                return res
             except TimeoutError as err:
                 self.timeouts += 1
+                if self.tuner is not None:
+                    self.tuner.record(length, None)
+                self._record(0x03, length, answered=False)
                 errs.append(err)
                 _LOG.error(
                     "Read register %s (count %s): %s [attempt %s/%s]",
@@ -193,61 +374,111 @@ class Sunsynk:
 
         raise ExceptionGroup(f"Failed to read {length} registers at {start}", errs)
 
-    async def read_sensors(self, sensors: Iterable[Sensor]) -> None:
-        """Read a list of sensors - Sunsynk supports function code 0x03."""
+    @property
+    def batch_size(self) -> int:
+        """Maximum registers per read request."""
+        if self.tuner is not None:
+            return self.tuner.size
+        return self.read_sensors_batch_size
+
+    def read_time(self, sensors: Iterable[Sensor]) -> float:
+        """Estimate the time to read sensors from the measured round trip.
+
+        Before the first read, use the RTU airtime of the port, if known.
+        """
+        groups = self.plan(sensors)
+        if self.rtt or self.airtime is None:
+            return len(groups) * self.rtt
+        return sum(self.airtime.request_time(0x03, g[-1] - g[0] + 1) for g in groups)
+
+    async def _read_group(self, grp: list[int]) -> dict[int, int] | Exception:
+        """Read one register group. Return the register map or the error."""
+        glen = grp[-1] - grp[0] + 1
+        try:
+            perf = time.perf_counter()
+            r_r = await self.read_holding_registers(grp[0], glen)
+            perf = time.perf_counter() - perf
+            _LOG.debug(
+                "Time taken to fetch %s registers starting at %s : %ss",
+                glen,
+                grp[0],
+                f"{perf:.2f}",
+            )
+        except Exception as err:
+            return Exception(
+                f"{err.__class__.__name__} reading {glen} registers from {grp[0]}: {err}"
+            )
+
+        if len(r_r) != glen:
+            return OSError(
+                f"response length mismatch reading {glen} registers from "
+                f"{grp[0]}: got {len(r_r)}"
+            )
+
+        regs = register_map(grp[0], r_r)
+        _LOG.debug(
+            "Request registers: %s glen=%d. Response %s len=%d. regs=%s",
+            grp,
+            glen,
+            r_r,
+            len(r_r),
+            regs,
+        )
+        return regs
+
+    def plan(self, sensors: Iterable[Sensor]) -> list[list[int]]:
+        """Register groups to read for ``sensors``. Memoized for a frozenset."""
+        key = None
+        if isinstance(sensors, frozenset):
+            key = (
+                sensors,
+                self.batch_size,
+                self.allow_gap,
+                self.request_cost,
+            )
+            if (groups := self._plans.get(key)) is not None:
+                return groups
+
         # Check if state is ok & tracking the sensors being read
         assert self.state is not None
         for sen in sensors:
             if sen not in self.state.values:
                 _LOG.warning("sensor %s not being tracked", sen.id)
 
-        new_regs: dict[int, int] = {}
-        errs: list[Exception] = []
-        groups = group_sensors(
-            sensors,
-            allow_gap=self.allow_gap,
-            max_group_size=self.read_sensors_batch_size,
-        )
-        for grp in groups:
-            glen = grp[-1] - grp[0] + 1
-            try:
-                perf = time.perf_counter()
-                r_r = await self.read_holding_registers(grp[0], glen)
-                perf = time.perf_counter() - perf
-                _LOG.debug(
-                    "Time taken to fetch %s registers starting at %s : %ss",
-                    glen,
-                    grp[0],
-                    f"{perf:.2f}",
-                )
-            except Exception as err:
-                errs.append(
-                    Exception(
-                        f"{err.__class__.__name__} reading {glen} registers from {grp[0]}: {err}"
-                    )
-                )
-                continue
-
-            if len(r_r) != glen:
-                errs.append(
-                    OSError(
-                        f"response length mismatch reading {glen} registers from "
-                        f"{grp[0]}: got {len(r_r)}"
-                    )
+        if self.request_cost:
+            groups = plan_groups(
+                sensors,
+                request_cost=self.request_cost,
+                max_group_size=self.batch_size,
+            )
+        else:
+            groups = list(
+                group_sensors(
+                    sensors,
+                    allow_gap=self.allow_gap,
+                    max_group_size=self.batch_size,
                 )
-                continue
+            )
+        if key is not None:
+            if len(self._plans) > 64:
+                self._plans.clear()
+            self._plans[key] = groups
+        return groups
 
-            regs = register_map(grp[0], r_r)
-            new_regs.update(regs)
+    async def read_sensors(self, sensors: Iterable[Sensor]) -> None:
+        """Read a list of sensors - Sunsynk supports function code 0x03.
 
-            _LOG.debug(
-                "Request registers: %s glen=%d. Response %s len=%d. regs=%s",
-                grp,
-                glen,
-                r_r,
-                len(r_r),
-                regs,
-            )
+        Pass a ``frozenset`` to reuse the register groups of an earlier read.
+        """
+        results = [await self._read_group(grp) for grp in self.plan(sensors)]
+
+        new_regs: dict[int, int] = {}
+        errs: list[Exception] = []
+        for res in results:
+            if isinstance(res, Exception):
+                errs.append(res)
+            else:
+                new_regs.update(res)
 
         self.state.update(new_regs)
         if errs:
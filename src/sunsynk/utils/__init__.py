@@ -6,9 +6,16 @@ from pathlib import Path
 from types import ModuleType
 
 from .pretty_table import pretty_table, pretty_table_sensors, table_data
-from .stats import percentile
+from .stats import History, RingBuffer, percentile
 
-__all__ = ["percentile", "pretty_table", "pretty_table_sensors", "table_data"]
+__all__ = [
+    "History",
+    "RingBuffer",
+    "percentile",
+    "pretty_table",
+    "pretty_table_sensors",
+    "table_data",
+]
 
 
 def import_module(mod_name: str, folder: str | Path | None = None) -> ModuleType:
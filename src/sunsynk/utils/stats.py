@@ -1,6 +1,9 @@
 """Statistics utilities."""
 
-from collections.abc import Iterable
+from array import array
+from collections.abc import Iterable, Iterator
+
+from sunsynk.helpers import NumType, int_round
 
 
 def percentile(data: Iterable[float], percentile: int) -> float:
@@ -32,3 +35,120 @@ def percentile(data: Iterable[float], percentile: int) -> float:
     upper_value = sorted_data[upper_index]
     fraction = rank - lower_index
     return lower_value + (upper_value - lower_value) * fraction
+
+
+class RingBuffer:
+    """Fixed-capacity numeric history with a running sum.
+
+    Values are stored as doubles in an ``array`` and returned through
+    ``int_round``, so whole numbers come back as ``int``.
+    """
+
+    __slots__ = ("_buf", "_start", "capacity", "count", "total")
+
+    def __init__(self, capacity: int) -> None:
+        """Allocate the buffer."""
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1.")
+        self.capacity = capacity
+        self._buf = array("d", bytes(8 * capacity))
+        self._start = 0
+        self.count = 0
+        self.total = 0.0
+
+    def append(self, val: NumType) -> None:
+        """Add a value, dropping the oldest when full."""
+        if self.count < self.capacity:
+            self._buf[(self._start + self.count) % self.capacity] = val
+            self.count += 1
+            self.total += val
+            return
+        self.total += val - self._buf[self._start]
+        self._buf[self._start] = val
+        self._start = (self._start + 1) % self.capacity
+        if self._start == 0:  # resync the running sum once per lap (float drift)
+            self.total = sum(self._buf)
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self._start = 0
+        self.count = 0
+        self.total = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return self.count
+
+    def __getitem__(self, idx: int) -> NumType:
+        """Get a value, oldest first. Negative indexes count from the newest."""
+        if idx < 0:
+            idx += self.count
+        if not 0 <= idx < self.count:
+            raise IndexError("RingBuffer index out of range")
+        return int_round(self._buf[(self._start + idx) % self.capacity])
+
+    def __iter__(self) -> Iterator[NumType]:
+        """Iterate oldest to newest."""
+        return (self[i] for i in range(self.count))
+
+    def __repr__(self) -> str:
+        """Return the values."""
+        return f"RingBuffer({list(self)}, capacity={self.capacity})"
+
+
+class History:
+    """Numeric history of a sensor since the last report.
+
+    The first value (the carried average, or the first reading) is kept apart
+    from a ``RingBuffer`` of the recent readings. ``total`` and ``count`` cover
+    every value since ``clear``, so a full ring does not change the average.
+    """
+
+    __slots__ = ("count", "first", "recent", "total")
+
+    def __init__(self, capacity: int) -> None:
+        """Allocate the ring of recent readings."""
+        self.recent = RingBuffer(capacity)
+        self.first = 0.0
+        self.count = 0
+        self.total = 0.0
+
+    def append(self, val: NumType) -> None:
+        """Add a value."""
+        if self.count:
+            self.recent.append(val)
+        else:
+            self.first = val
+        self.count += 1
+        self.total += val
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self.recent.clear()
+        self.count = 0
+        self.total = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of values since ``clear``."""
+        return self.count
+
+    def __getitem__(self, idx: int) -> NumType:
+        """Get a value, oldest first. Evicted readings raise ``IndexError``."""
+        if idx < 0:
+            idx += self.count
+        if idx == 0 and self.count:
+            return int_round(self.first)
+        ridx = idx - self.count + len(self.recent)
+        if not 0 <= ridx < len(self.recent):
+            raise IndexError("History index out of range")
+        return self.recent[ridx]
+
+    def __iter__(self) -> Iterator[NumType]:
+        """Iterate the first value and the recent readings."""
+        if self.count:
+            yield int_round(self.first)
+            yield from self.recent
+
+    def __repr__(self) -> str:
+        """Return the values."""
+        return f"History({list(self)}, count={self.count})"
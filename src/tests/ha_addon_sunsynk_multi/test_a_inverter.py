@@ -1,19 +1,23 @@
 """Tests for ha_addon_sunsynk_multi.a_inverter."""
 
+import asyncio
 import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from ha_addon_sunsynk_multi.a_inverter import AInverter
-from ha_addon_sunsynk_multi.a_sensor import MQTT
+from ha_addon_sunsynk_multi.a_sensor import MQTT, ASensor
 from ha_addon_sunsynk_multi.options import OPT, InverterOptions
-from ha_addon_sunsynk_multi.sensor_options import DEFS, import_definitions
+from ha_addon_sunsynk_multi.sensor_options import DEFS, SensorOption, import_definitions
 from sunsynk.definitions.single_phase import SENSORS
 from sunsynk.identity import Identity
+from sunsynk.sensors import Sensor
 from sunsynk.state import InverterState
 from sunsynk.sunsynk import Sunsynk
 
+from .conftest import NOSCHEDULE, ist_factory
+
 # Avoid lifecycle MQTT publish calling wait_connected() (no broker in unit tests).
 P_MOCK_MQTT_PUBLISH_AVAILABILITY = patch(
     "ha_addon_sunsynk_multi.a_inverter.MQTT.publish_availability",
@@ -289,3 +293,82 @@ async def test_connect_identity_failure_includes_cause() -> None:
         await ist.connect()
 
     assert "solarman://192.168.5.30:50500" in str(raised.value)
+
+
+async def test_publish_sensors_coalesce(state: InverterState) -> None:
+    """Publish a tick concurrently and merge states arriving mid-burst."""
+    inv_opt = InverterOptions(modbus_id=1, ha_prefix="test")
+    ist = _ist(inv_opt, MagicMock(spec=Sunsynk), state=state)
+
+    gate, full = asyncio.Event(), asyncio.Event()
+    inflight = peak = 0
+
+    async def _publish(val: object, *, dedup: bool) -> None:
+        nonlocal inflight, peak
+        inflight += 1
+        peak = max(peak, inflight)
+        if peak == 2:
+            full.set()
+        await gate.wait()
+        inflight -= 1
+
+    sens = [
+        MagicMock(publish=AsyncMock(side_effect=_publish), json_key="")
+        for _ in range(5)
+    ]
+    sens[4].entity = None  # never created, not published
+
+    with patch.object(OPT, "mqtt_publish_concurrency", 2):
+        first = asyncio.create_task(ist.publish_sensors(states=dict.fromkeys(sens, 1)))
+        await asyncio.wait_for(full.wait(), 1)
+
+        # Two more ticks while the first burst is in flight: latest value wins
+        await ist.publish_sensors(states={sens[0]: 2})
+        await ist.publish_sensors(states={sens[0]: 3, sens[1]: 3})
+        gate.set()
+        await first
+
+    assert peak == 2
+    assert sens[0].publish.await_args_list[-1].args == (3,)
+    assert [s.publish.await_count for s in sens] == [2, 2, 1, 1, 0]
+
+
+async def test_publish_json(state: InverterState) -> None:
+    """Send changed keys, with a full snapshot every MQTT_JSON_SNAPSHOT."""
+    inv_opt = InverterOptions(modbus_id=1, ha_prefix="test")
+    ist = _ist(inv_opt, MagicMock(spec=Sunsynk), state=state)
+    assert ist.json_topic == "SS/test/state_json"
+
+    with (
+        patch.object(MQTT, "publish", new_callable=AsyncMock) as pub,
+        patch.object(OPT, "mqtt_json_snapshot", 300),
+    ):
+        await ist.publish_json({"a": 1, "b": True})
+        await ist.publish_json({"a": 1, "b": False})
+        await ist.publish_json({"a": 1})
+        ist._json_snapshot_at = 0
+        await ist.publish_json({"c": "x"})
+
+    assert [c.args for c in pub.await_args_list] == [
+        ("SS/test/state_json", '{"a":1,"b":"ON"}'),
+        ("SS/test/state_json", '{"b":"OFF"}'),
+        ("SS/test/state_json", '{"a":1,"b":"OFF","c":"x"}'),
+    ]
+
+
+def test_discovery_info_changed() -> None:
+    """Only rebuilt entities with a changed payload are reported."""
+    ist = ist_factory("888", "ss1")
+    one, two = Sensor(1, "one", "W"), Sensor(2, "two", "W")
+    for sen in (one, two):
+        st = ASensor(opt=SensorOption(sensor=sen, schedule=NOSCHEDULE, visible=True))
+        ist.ss[sen.id] = st
+        ist.mqtt_dev.components[sen.id] = st.create_entity(ist)
+
+    assert ist.hass_create_discovery_info() == {"888_one", "888_two"}
+    assert ist.hass_create_discovery_info([one]) == set()
+
+    one.unit = "kW"
+    assert ist.hass_create_discovery_info([two]) == set()
+    assert ist.hass_create_discovery_info([one]) == {"888_one"}
+    assert ist.hass_create_discovery_info() == set()
@@ -1,6 +1,7 @@
 """States."""
 
 import logging
+from unittest.mock import patch
 
 import pytest
 from mqtt_entity import MQTTEntity
@@ -8,6 +9,7 @@ from mqtt_entity.helpers import hass_abbreviate
 
 from ha_addon_sunsynk_multi.a_inverter import STATE
 from ha_addon_sunsynk_multi.a_sensor import ASensor
+from ha_addon_sunsynk_multi.options import OPT
 from ha_addon_sunsynk_multi.sensor_options import SensorOption
 from sunsynk.helpers import slug
 from sunsynk.sensors import Sensor
@@ -82,6 +84,27 @@ def test_create_entity2() -> None:
     }
 
 
+def test_create_entity_json() -> None:
+    """Read-only sensors read the JSON state document with MQTT_JSON_STATE."""
+    ist = ist_factory("888", "ss1", 1)
+    st = ASensor(
+        opt=SensorOption(
+            sensor=Sensor(1, "one", "W"), schedule=NOSCHEDULE, visible=True
+        ),
+    )
+    with patch.object(OPT, "mqtt_json_state", True):
+        ent = st.create_entity(ist)
+    entd: dict = hass_abbreviate(ent.as_discovery_dict)
+    assert st.json_key == "one"
+    assert entd["stat_t"] == "SS/ss1/state_json"
+    assert entd["val_tpl"] == (
+        "{{ value_json['one'] if 'one' in value_json else this.state }}"
+    )
+
+    st.create_entity(ist)
+    assert st.json_key == ""
+
+
 def test_create_fail() -> None:
     """Create entity."""
     serial, ha_prefix = "888", "ss1"
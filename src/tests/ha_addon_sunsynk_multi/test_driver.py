@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, patch
 from ha_addon_sunsynk_multi.a_inverter import AInverter
 from ha_addon_sunsynk_multi.driver import STATE, init_driver
 from ha_addon_sunsynk_multi.options import OPT
+from sunsynk.arbiter import ArbitratedUnit
 from sunsynk.solarman import SolarmanUnit
 from sunsynk.sunsynk import Sunsynk
 
@@ -31,20 +32,26 @@ def test_init() -> None:
     assert ist.read_attempts == 3
     mock_conn.for_unit.assert_called_once_with(1)
     open_conn.assert_called_once_with(
-        inv_port, timeout=OPT.timeout, message_spacing=0.05
+        inv_port, baudrate=9600, timeout=OPT.timeout, message_spacing=0.05
     )
 
     AInverter.connections.clear()
     AInverter.solarman_ports.clear()
     OPT.read_message_spacing = 0
+    OPT.baudrate = 19200
     mock_conn = MagicMock()
     mock_conn.for_unit.return_value = MagicMock()
     with patch(
         "ha_addon_sunsynk_multi.driver.open_connection", return_value=mock_conn
     ) as open_conn:
         init_driver(OPT)
-    open_conn.assert_called_once_with(inv_port, timeout=OPT.timeout, message_spacing=0)
+    open_conn.assert_called_once_with(
+        inv_port, baudrate=19200, timeout=OPT.timeout, message_spacing=0
+    )
+    assert STATE[0].inv.airtime is not None
+    assert STATE[0].inv.airtime.baudrate == 19200
     OPT.read_message_spacing = 0.05
+    OPT.baudrate = 9600
 
     AInverter.connections.clear()
     AInverter.solarman_ports.clear()
@@ -67,3 +74,27 @@ def test_init() -> None:
     assert isinstance(ist.unit, SolarmanUnit)
     assert ist.port == solar_port
     assert ist.unit.dongle_serial_number == 101
+
+
+def test_init_shared_bus() -> None:
+    """Inverters on one Modbus port share a bus arbiter."""
+    port = "tcp://127.0.0.1:123"
+    OPT.inverters = []
+    OPT.load_dict(
+        {
+            "inverters": [
+                {"port": port, "modbus_id": 1},
+                {"port": port, "modbus_id": 2},
+                {"port": "tcp://127.0.0.1:124", "modbus_id": 1},
+            ]
+        }
+    )
+    AInverter.connections.clear()
+    with patch("ha_addon_sunsynk_multi.driver.open_connection"):
+        init_driver(OPT)
+
+    assert list(AInverter.arbiters) == [port]
+    units = [ist.inv.unit for ist in STATE]
+    assert [isinstance(u, ArbitratedUnit) for u in units] == [True, True, False]
+    assert [u.key for u in units[:2]] == [1, 2]  # type: ignore[attr-defined]
+    assert units[0].arbiter is units[1].arbiter  # type: ignore[attr-defined]
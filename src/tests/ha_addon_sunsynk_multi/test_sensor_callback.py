@@ -2,19 +2,23 @@
 
 from collections import defaultdict
 from inspect import iscoroutinefunction
+from itertools import pairwise
 from unittest.mock import Mock, patch
 
 import pytest
 
 from ha_addon_sunsynk_multi.a_inverter import AInverter
-from ha_addon_sunsynk_multi.sensor_callback import SensorRun, build_callback_schedule
+from ha_addon_sunsynk_multi.sensor_callback import (
+    SensorRun,
+    SensorSchedule,
+    build_callback_schedule,
+    check_bus_load,
+)
 from ha_addon_sunsynk_multi.sensor_options import SOPT, Sensor, SensorOption
 from ha_addon_sunsynk_multi.timer_schedule import Schedule
 
 from .conftest import ist_factory
 
-pytestmark = pytest.mark.asyncio
-
 
 async def test_build_callback_schedule() -> None:
     """Test build_callback_schedule."""
@@ -59,7 +63,7 @@ async def test_build_callback_schedule() -> None:
         def publish_sensors() -> list[str]:
             return [k.name for k in ist.publish_sensors.call_args.kwargs["states"]]  # type: ignore[attr-defined]
 
-        def next_run() -> tuple[int, int, int]:
+        def next_run() -> tuple[float, float, float]:
             return (
                 read_s[1].next_run,
                 report_s[10].next_run,
@@ -113,3 +117,118 @@ TEST1 = (
         visible=True,
     ),
 )
+
+
+async def test_refresh_after_restore() -> None:
+    """After a snapshot restore, the first full read holds off the poll."""
+    SOPT.clear()
+    SOPT.update({s.sensor: s for s in TEST1})
+    ist = ist_factory("888", "ss1", 1)
+    ist.restored = 2
+    build_callback_schedule(ist)
+    assert ist.cb.task is not None
+
+    ist.cb.call(1)
+    assert ist.cb.stat_busy_count == 1
+    await ist.cb.task
+    ist.read_sensors.assert_awaited_once_with(sensors=list(SOPT))  # type: ignore[attr-defined]
+
+    ist.cb.call(2)
+    await ist.cb.task
+    assert ist.read_sensors.await_count == 2  # type: ignore[attr-defined]
+
+
+def test_read_plan() -> None:
+    """Sensors per due read intervals are memoized until the schedule is rebuilt."""
+    SOPT.clear()
+    SOPT.update({s.sensor: s for s in TEST1})
+    sched = SensorSchedule().build_schedules(0)
+    assert set(sched.read) == {1}
+
+    plan = sched.read_plan(frozenset((1,)))
+    assert plan == {TEST1[0].sensor, TEST1[1].sensor}
+    assert sched.read_plan(frozenset((1,))) is plan
+
+    sched.build_schedules(0)
+    assert sched.read_plans == {}
+
+
+def test_sensor_run_due() -> None:
+    """Runs stay on their grid when the tick does not divide the interval."""
+    runs = {1: SensorRun(), 5: SensorRun()}
+    times: dict[float, list[float]] = {1: [], 5: []}
+    for k in range(1, 201):  # 60 seconds at a 0.3 second tick
+        now = round(k * 0.3 + 0.05, 6)
+        for sec, srun in runs.items():
+            if srun.due(now, sec):
+                times[sec].append(now)
+    assert len(times[1]) == 60
+    assert len(times[5]) == 12
+    assert max(b - a for a, b in pairwise(times[1])) < 1.3
+
+    # A late run catches up instead of running for every missed interval
+    assert runs[1].due(100, 1)
+    assert runs[1].next_run == 101
+    assert not runs[1].due(100.5, 1)
+
+
+def test_bus_load() -> None:
+    """Sub-second reads the bus cannot sustain are slowed down."""
+    fast = SensorOption(
+        sensor=Sensor(3, name="fast", unit="W"),
+        schedule=Schedule(read_every=0.2, report_every=10),
+    )
+    SOPT.clear()
+    SOPT.update({s.sensor: s for s in (*TEST1, fast)})
+    sched = SensorSchedule().build_schedules(0)
+    assert sched.tick == 0.2
+
+    inv = Mock()
+    inv.read_time = lambda sensors: 0.1 * len(sensors)
+    # 0.1s per 0.2s and 0.2s per second
+    assert sched.bus_load(inv) == pytest.approx(0.7)
+
+    sched.slow_down(2)
+    assert set(sched.read) == {0.4, 1}
+    assert sched.read[0.4].sensors == {fast}
+    assert sched.tick == 0.4
+
+    sched.slow_down(10)
+    assert set(sched.read) == {1}
+    assert sched.read[1].sensors == {*TEST1, fast}
+
+
+def test_check_bus_load(caplog: pytest.LogCaptureFixture) -> None:
+    """Warn when the read schedules need more than the bus, per port."""
+    fast = SensorOption(
+        sensor=Sensor(3, name="fast", unit="W"),
+        schedule=Schedule(read_every=0.5, report_every=10),
+    )
+    SOPT.clear()
+    SOPT.update({s.sensor: s for s in TEST1})
+    ists = [ist_factory("888", "ss1", 1), ist_factory("889", "ss2", 2)]
+    for ist in ists:
+        build_callback_schedule(ist)
+        ist.inv.port = "/dev/ttyUSB0"
+        ist.inv.read_time = lambda sensors: 0.01 * len(list(sensors))  # type: ignore[method-assign]
+
+    # 2 inverters x 2 sensors x 10ms per second
+    check_bus_load(ists)
+    assert "need 4% of the bus on /dev/ttyUSB0" in caplog.text
+
+    ists[0].inv.read_time = lambda sensors: 0.6 * len(list(sensors))  # type: ignore[method-assign]
+    check_bus_load(ists)
+    assert "need 122% of the bus on /dev/ttyUSB0 (2 inverters). Read less" in (
+        caplog.text
+    )
+
+    # Sub-second reads are slowed down, with the callback
+    SOPT.update({fast.sensor: fast})
+    for ist in ists:
+        build_callback_schedule(ist)
+    check_bus_load(ists)
+    assert "need 244% of the bus on /dev/ttyUSB0 (2 inverters). Sub-second" in (
+        caplog.text
+    )
+    assert [set(ist.sched.read) for ist in ists] == [{1}, {1}]
+    assert [(ist.cb.every, ist.cb.offset) for ist in ists] == [(1, 0), (1, 0)]
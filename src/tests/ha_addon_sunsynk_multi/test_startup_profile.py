@@ -0,0 +1,45 @@
+"""Test the startup profile."""
+
+import logging
+
+import pytest
+
+from ha_addon_sunsynk_multi.startup_profile import (
+    StartupProfile,
+    log_import_times,
+    parse_importtime,
+)
+
+
+def test_phases() -> None:
+    """Phases are ranked by wall time, also when they fail."""
+    prof = StartupProfile()
+    with prof.phase("fast"):
+        pass
+    with pytest.raises(ValueError), prof.phase("failed"):
+        raise ValueError
+    prof.phases.append(("slow", 1e6))
+
+    assert [p[0] for p in prof.phases] == ["fast", "failed", "slow"]
+    lines = prof.table().splitlines()
+    assert "slow" in lines[3]
+    assert "total" in lines[-2]
+
+
+def test_parse_importtime() -> None:
+    """Parse the stderr of python -X importtime."""
+    text = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       150 |        150 |   _io\n"
+        "import time:      1200 |       1350 | json\n"
+        "some other output\n"
+    )
+    assert parse_importtime(text) == [("_io", 150, 150), ("json", 1200, 1350)]
+
+
+async def test_log_import_times(caplog: pytest.LogCaptureFixture) -> None:
+    """Import a module in a subprocess."""
+    with caplog.at_level(logging.INFO):
+        await log_import_times("json")
+    assert "Import profile" in caplog.text
+    assert "json" in caplog.text
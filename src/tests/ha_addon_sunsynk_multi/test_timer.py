@@ -2,8 +2,10 @@
 
 import asyncio
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
 from statistics import mean
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -11,60 +13,131 @@ from ha_addon_sunsynk_multi.timer_callback import (
     AsyncCallback,
     Callback,
     SyncCallback,
+    due_time,
     run_callbacks,
 )
 from ha_addon_sunsynk_multi.timer_schedule import Schedule
 
 _LOG = logging.getLogger(__name__)
-# All test coroutines will be treated as marked.
-pytestmark = pytest.mark.asyncio
+
+
+@contextmanager
+def fake_clock(start: float, end: float) -> Iterator[list[float]]:
+    """Run the timer on a fake clock, from ``start`` until ``end`` seconds.
+
+    ``time`` and the loop's monotonic clock read the fake clock, and the
+    timer's sleep advances it. Callbacks can advance it to take time.
+    """
+    clock = [start]
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay: float) -> None:
+        for _ in range(3):  # let the callback tasks run
+            await real_sleep(0)
+        clock[0] += max(delay, 0)
+        if clock[0] >= end:
+            raise TimeoutError
+
+    with (
+        patch("ha_addon_sunsynk_multi.timer_callback.time") as mock_time,
+        patch("ha_addon_sunsynk_multi.timer_callback.asyncio") as mock_asyncio,
+    ):
+        mock_time.time.side_effect = lambda: clock[0]
+        mock_time.perf_counter.side_effect = lambda: clock[0]
+        mock_asyncio.get_running_loop.return_value.time.side_effect = lambda: clock[0]
+        mock_asyncio.sleep.side_effect = sleep
+        mock_asyncio.create_task.side_effect = asyncio.create_task
+        yield clock
 
 
 async def test_timer() -> None:
     """Test the timer."""
     run = {1: 0, 2: 0}
 
-    async def run1(now: int) -> None:
-        run[1] += 1
-        _LOG.debug("\t" * 3 + "run1: now=%s cnt=%s", now, run[1])
-        await asyncio.sleep(0.02)
+    with fake_clock(1000, 1009.99) as clock:
 
-    def run2(now: int) -> None:
-        run[2] += 1
-        _LOG.debug("\t" * 6 + "run2: now=%s cnt=%s", now, run[2])
-        # assert now % 2 == 0
+        async def run1(now: float) -> None:
+            run[1] += 1
+            _LOG.debug("\t" * 3 + "run1: now=%s cnt=%s", now, run[1])
+            await asyncio.sleep(0)
+            clock[0] += 0.02  # busy for 20ms
 
-    cbs: list[Callback] = [
-        AsyncCallback(name="test", callback=run1, every=1, keep_stats=True),
-        SyncCallback(name="test2", callback=run2, every=2, keep_stats=True),
-    ]
+        def run2(now: float) -> None:
+            run[2] += 1
+            _LOG.debug("\t" * 6 + "run2: now=%s cnt=%s", now, run[2])
 
-    with patch(
-        "ha_addon_sunsynk_multi.timer_callback.ZonedDateTime",
-    ) as mock_zdt:
-        # loop duration should be 950ms, so sleep is short (1000ms - 950ms = 50ms)
-        lst = [per_loop for t in range(2000, 20000, 1000) for per_loop in (t, t + 950)]
+        cbs: list[Callback] = [
+            AsyncCallback(name="test", callback=run1, every=0.5, keep_stats=True),
+            SyncCallback(name="test2", callback=run2, every=1.5, keep_stats=True),
+        ]
+
+        with pytest.raises(TimeoutError):
+            await run_callbacks(cbs)
+
+    assert run == {1: 20, 2: 8}
+    assert cbs[0].next_run == 1010
+    assert cbs[1].next_run == 1011
+    assert len(cbs[0].stat_time) == 20
+    assert len(cbs[1].stat_time) == 8
+    assert mean(cbs[0].stat_time) == pytest.approx(0.02)
+    assert mean(cbs[1].stat_time) == 0
 
-        def get_now():
 
-            val = lst.pop(0)
-            res = MagicMock()
-            res.timestamp_millis.return_value = val
-            _LOG.debug("get_now: %s", res.timestamp_millis())
-            return res
+async def test_timer_offset() -> None:
+    """Callbacks with the same interval take turns by offset."""
+    calls: list[tuple[str, float, float]] = []
 
-        mock_zdt.now_in_system_tz.side_effect = get_now
+    with fake_clock(1000, 1003.99) as clock:
 
-        try:
+        def _cb(name: str) -> SyncCallback:
+            return SyncCallback(
+                name=name,
+                every=1,
+                offset=0.25 if name == "b" else 0,
+                callback=lambda now: calls.append((name, now, clock[0])),
+            )
+
+        cbs: list[Callback] = [_cb("b"), _cb("a")]
+        with pytest.raises(TimeoutError):
             await run_callbacks(cbs)
-        except IndexError:  # seconds are done
-            pass
 
-    assert run == {1: 18, 2: 9}
-    assert len(cbs[0].stat_time) == 18
-    assert len(cbs[1].stat_time) == 9
-    assert mean(cbs[0].stat_time) >= 0.02
-    assert mean(cbs[1].stat_time) < 0.01
+    # The first run is immediate, then a runs on the grid and b 0.25s later
+    assert calls[:2] == [("a", 1000, 1000), ("b", 1000, 1000)]
+    assert calls[2:] == [
+        (name, now, now + (0.25 if name == "b" else 0))
+        for now in (1001, 1002, 1003)
+        for name in "ab"
+    ]
+
+
+async def test_timer_retry_failed() -> None:
+    """A failed async callback is retried soon, not a full interval later."""
+    calls: list[float] = []
+
+    with fake_clock(1000, 1012.99):
+
+        async def _cb(now: float) -> None:
+            calls.append(now)
+            if len(calls) == 1:
+                raise ValueError("fail")
+
+        cb = AsyncCallback(name="fail", every=5, callback=_cb)
+        with pytest.raises(TimeoutError):
+            await run_callbacks([cb])
+
+    # next_run moves back from 1005 to 1000 after the failure
+    assert calls == [1000, 1000, 1005, 1010]
+    assert cb.stat_error_count == 1
+
+
+def test_due_time() -> None:
+    """Late callbacks skip to the latest slot, instead of catching up."""
+    cb = SyncCallback(name="x", every=5, next_run=100, callback=print)
+    assert due_time(cb, 100.5) == 100
+    assert due_time(cb, 104.9) == 100
+    assert due_time(cb, 112) == 110
+    cb.every = 0.5
+    assert due_time(cb, 101.2) == 101
 
 
 async def test_schedule() -> None:
@@ -92,3 +165,15 @@ async def test_schedule() -> None:
     assert s.significant_change([100], 120)
     assert s.significant_change([100], 111)
     assert s.significant_change([100], 200)
+
+
+def test_schedule_history_size() -> None:
+    """History capacity follows read & report intervals."""
+    assert Schedule(key="x", read_every=5, report_every=60).history_size == 14
+    assert Schedule(key="x", read_every=1, report_every=300).history_size == 302
+    assert Schedule(key="x").history_size == 2
+    assert Schedule(key="x", read_every=0.5, report_every=60).history_size == 122
+
+    s = Schedule(key="x", change_by=80)
+    assert s.is_significant(None, 90) is False
+    assert s.is_significant(100.0, 180)
@@ -0,0 +1,334 @@
+"""Simulated inverter for load tests, without hardware.
+
+``FakeInverter`` is a ``HoldingUnit`` (pass it as ``Sunsynk(unit=...)``), and
+``serve`` exposes one or more of them on a port URL that ``open_connection`` or
+``SolarmanUnit`` accepts: ``tcp://``, ``serial-tcp://`` (RTU framing) or
+``solarman-tcp://`` (a Solarman V5 stand-in).
+
+    uv run src/tests/sunsynk/fake_inverter.py --definitions three-phase --count 24
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import random
+import struct
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from functools import partial
+from urllib.parse import urlparse
+
+from sunsynk.definitions import ALL_DEFS, import_defs
+from sunsynk.rwsensors import RWSensor
+from sunsynk.sensors import SensorDefinitions
+
+_LOG = logging.getLogger(__name__)
+
+type Units = Mapping[int, FakeInverter]
+"""Inverters on one port, keyed by server ID."""
+
+
+def crc16(data: bytes) -> int:
+    """Modbus RTU CRC-16."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def rtu_frame(server_id: int, pdu: bytes) -> bytes:
+    """Wrap a PDU in an RTU frame (server ID and CRC)."""
+    frame = bytes((server_id,)) + pdu
+    return frame + struct.pack("<H", crc16(frame))
+
+
+@dataclass(kw_only=True)
+class FakeInverter:
+    """Holding registers in memory, with configurable timing and failures."""
+
+    registers: dict[int, int] = field(default_factory=dict)
+    latency: float = 0
+    """Fixed delay per request, in seconds. Concurrent requests overlap."""
+    jitter: float = 0
+    """Random extra delay per request, up to this many seconds."""
+    register_time: float = 0
+    """Delay per register, in seconds. Requests take turns, like on a bus."""
+    timeout_rate: float = 0
+    """Fraction of requests that never get a response."""
+    timeout: float = 3
+    """Wait before ``TimeoutError`` for a dropped request (``HoldingUnit`` use)."""
+    drift: int = 0
+    """Largest random step of the ``dynamic`` registers on each read."""
+    dynamic: list[int] = field(default_factory=list)
+    """Registers that change over time (measurements, not settings)."""
+    seed: int | None = None
+    connected: bool = True
+
+    requests: int = 0
+    dropped: int = 0
+    _rnd: random.Random = field(init=False, repr=False)
+    _bus: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Seed the random generator."""
+        self._rnd = random.Random(self.seed)
+
+    @classmethod
+    def from_definitions(
+        cls, defs: SensorDefinitions, *, seed: int | None = None, **kwargs: object
+    ) -> FakeInverter:
+        """Fill the registers of every sensor in a definitions profile.
+
+        Settings (``RWSensor``) start at 0, measurements at a random value and
+        drift when ``drift`` is set.
+        """
+        rnd = random.Random(seed)
+        regs: dict[int, int] = {}
+        dynamic: set[int] = set()
+        for sen in defs.all.values():
+            measured = not isinstance(sen, RWSensor)
+            for adr in sen.address:
+                regs.setdefault(adr, rnd.randrange(1000) if measured else 0)
+                if measured and not sen.bitmask:
+                    dynamic.add(adr)
+        return cls(
+            registers=regs,
+            dynamic=sorted(dynamic),
+            seed=seed,
+            **kwargs,  # type: ignore[arg-type]
+        )
+
+    async def respond(self, count: int) -> bool:
+        """Wait like a real inverter. False when the request is dropped."""
+        self.requests += 1
+        if self.timeout_rate and self._rnd.random() < self.timeout_rate:
+            self.dropped += 1
+            return False
+        delay = self.latency
+        if self.jitter:
+            delay += self._rnd.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.register_time > 0:
+            async with self._bus:
+                await asyncio.sleep(count * self.register_time)
+        return True
+
+    def read(self, address: int, count: int) -> list[int]:
+        """Return registers without delay."""
+        if self.drift:
+            for adr in self.dynamic:
+                step = self._rnd.randint(-self.drift, self.drift)
+                self.registers[adr] = min(0xFFFF, max(0, self.registers[adr] + step))
+        regs = self.registers
+        return [regs.get(adr, 0) for adr in range(address, address + count)]
+
+    def write(self, address: int, values: list[int]) -> None:
+        """Set registers without delay."""
+        for idx, val in enumerate(values):
+            self.registers[address + idx] = val & 0xFFFF
+
+    async def handle_pdu(self, pdu: bytes) -> bytes | None:
+        """Answer a Modbus request PDU (FC03, FC16). None when it is dropped."""
+        fcode = pdu[0]
+        if fcode == 0x03 and len(pdu) == 5:
+            start, count = struct.unpack(">HH", pdu[1:])
+            if not 1 <= count <= 125:
+                return bytes((0x83, 0x03))  # illegal data value
+            if await self.respond(count):
+                regs = self.read(start, count)
+                return struct.pack(f">BB{count}H", 0x03, 2 * count, *regs)
+            return None
+        if fcode == 0x10 and len(pdu) >= 6:
+            start, count, _ = struct.unpack(">HHB", pdu[1:6])
+            if await self.respond(count):
+                self.write(start, list(struct.unpack(f">{count}H", pdu[6:])))
+                return pdu[:5]
+            return None
+        return bytes((fcode | 0x80, 0x01))  # illegal function
+
+    async def read_holding_registers(self, address: int, count: int) -> list[int]:
+        """Read holding registers (FC03)."""
+        if not await self.respond(count):
+            await asyncio.sleep(self.timeout)
+            raise TimeoutError(f"No response reading {count} registers at {address}")
+        return self.read(address, count)
+
+    async def write_registers(self, address: int, values: list[int]) -> None:
+        """Write holding registers (FC16)."""
+        if not await self.respond(len(values)):
+            await asyncio.sleep(self.timeout)
+            raise TimeoutError(f"No response writing {len(values)} registers")
+        self.write(address, values)
+
+
+async def process_pdu(units: Units, server_id: int, pdu: bytes) -> bytes | None:
+    """Answer a request PDU for one of the units. None means no response."""
+    inv = units.get(server_id)
+    if inv is None or not pdu:
+        return None
+    return await inv.handle_pdu(pdu)
+
+
+async def _serve_tcp(
+    units: Units, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Modbus TCP (MBAP). Requests are answered concurrently, in any order."""
+    tasks: set[asyncio.Task[None]] = set()
+
+    async def _answer(tid: int, server_id: int, pdu: bytes) -> None:
+        res = await process_pdu(units, server_id, pdu)
+        if res is not None and not writer.is_closing():
+            writer.write(struct.pack(">HHHB", tid, 0, len(res) + 1, server_id) + res)
+
+    try:
+        while True:
+            tid, _, length, server_id = struct.unpack(
+                ">HHHB", await reader.readexactly(7)
+            )
+            if length < 2:
+                break
+            pdu = await reader.readexactly(length - 1)
+            task = asyncio.create_task(_answer(tid, server_id, pdu))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _read_rtu(reader: asyncio.StreamReader) -> bytes:
+    """Read one RTU request frame."""
+    head = await reader.readexactly(2)
+    if head[1] == 0x10:
+        head += await reader.readexactly(5)
+        return head + await reader.readexactly(head[6] + 2)
+    return head + await reader.readexactly(6)
+
+
+async def _serve_rtu(
+    units: Units, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """RTU framing over TCP (serial-tcp://). One request at a time."""
+    while True:
+        frame = await _read_rtu(reader)
+        if crc16(frame[:-2]) != struct.unpack("<H", frame[-2:])[0]:
+            _LOG.warning("CRC error in request %s", frame.hex())
+            continue
+        res = await process_pdu(units, frame[0], frame[1:-2])
+        if res is not None:
+            writer.write(rtu_frame(frame[0], res))
+
+
+async def _serve_solarman(
+    units: Units, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Solarman V5 frames around RTU requests, answered like a dongle would."""
+    while True:
+        head = await reader.readexactly(11)  # start, length, control, serial, logger
+        (length,) = struct.unpack("<H", head[1:3])
+        frame = head + await reader.readexactly(length + 2)
+        if head[0] != 0xA5 or frame[-1] != 0x15:
+            _LOG.warning("Invalid V5 frame %s", frame.hex())
+            continue
+        rtu = frame[26:-2]
+        res = await process_pdu(units, rtu[0], rtu[1:-2])
+        if res is None:
+            continue
+        payload = struct.pack("<BBIII", 0x02, 0x01, 0, 0, 0) + rtu_frame(rtu[0], res)
+        out = struct.pack("<BHH", 0xA5, len(payload), 0x1510) + head[5:11] + payload
+        writer.write(out + bytes((sum(out[1:]) & 0xFF, 0x15)))
+
+
+type _Handler = Callable[
+    [Units, asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]
+]
+
+HANDLERS: dict[str, _Handler] = {
+    "tcp": _serve_tcp,
+    "serial-tcp": _serve_rtu,
+    "solarman-tcp": _serve_solarman,
+}
+
+
+async def _connection(
+    handler: _Handler,
+    units: Units,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    """Serve one client until it disconnects, or the server shuts down."""
+    try:
+        await handler(units, reader, writer)
+    except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(url: str, units: Units) -> tuple[asyncio.Server, str]:
+    """Listen on ``url`` and answer for ``units``. Return the server and its URL.
+
+    Port 0 (or none) picks a free port; use the returned URL as the PORT.
+    """
+    parsed = urlparse(url)
+    handler = HANDLERS.get(parsed.scheme)
+    if handler is None:
+        raise ValueError(
+            f"Unknown scheme {parsed.scheme!r}: expected {', '.join(HANDLERS)}"
+        )
+    host = parsed.hostname or "127.0.0.1"
+    server = await asyncio.start_server(
+        partial(_connection, handler, units), host, parsed.port or 0
+    )
+    port = server.sockets[0].getsockname()[1]
+    return server, f"{parsed.scheme}://{host}:{port}"
+
+
+async def main() -> None:
+    """Serve simulated inverters until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve simulated inverters.")
+    parser.add_argument("--definitions", choices=ALL_DEFS, default="single-phase")
+    parser.add_argument("--url", default="tcp://127.0.0.1:5020", help="first port")
+    parser.add_argument("--count", type=int, default=1, help="ports to serve")
+    parser.add_argument("--ids", type=int, default=1, help="server IDs per port")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--register-time", type=float, default=0)
+    parser.add_argument("--timeout-rate", type=float, default=0)
+    parser.add_argument("--drift", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    defs = import_defs(args.definitions)
+    base = urlparse(args.url)
+    servers: list[asyncio.Server] = []
+    for idx in range(args.count):
+        units = {
+            sid: FakeInverter.from_definitions(
+                defs,
+                seed=idx * args.ids + sid,
+                latency=args.latency,
+                jitter=args.jitter,
+                register_time=args.register_time,
+                timeout_rate=args.timeout_rate,
+                drift=args.drift,
+            )
+            for sid in range(1, args.ids + 1)
+        }
+        port = base.port + idx if base.port else 0
+        server, url = await serve(f"{base.scheme}://{base.hostname}:{port}", units)
+        servers.append(server)
+        _LOG.info("%s: %s server ID(s) 1-%s", url, args.definitions, args.ids)
+
+    await asyncio.gather(*(srv.serve_forever() for srv in servers))
+
+
+if __name__ == "__main__":
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(main())
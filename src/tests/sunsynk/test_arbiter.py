@@ -0,0 +1,112 @@
+"""Test the bus arbiter."""
+
+import asyncio
+
+import pytest
+
+from sunsynk.arbiter import BusArbiter
+from sunsynk.sunsynk import BusAirtime, Sunsynk
+
+from .fake_inverter import FakeInverter
+
+
+class _Bus(list[str]):
+    """Log of the requests on the bus."""
+
+    def unit(self, name: str, registers: dict[int, int] | None = None) -> FakeInverter:
+        """Fake inverter that logs its requests."""
+        inv = FakeInverter(registers=registers or {}, latency=0.01)
+        respond = inv.respond
+
+        async def _respond(count: int) -> bool:
+            self.append(name)
+            return await respond(count)
+
+        inv.respond = _respond  # type: ignore[method-assign]
+        return inv
+
+
+async def test_round_robin_writes_first() -> None:
+    """Units take turns; a write jumps the queue."""
+    bus = _Bus()
+    arb = BusArbiter()
+    one = arb.unit(bus.unit("r1"), key=1)
+    two = arb.unit(bus.unit("r2"), key=2)
+    wone = arb.unit(bus.unit("w1"), key=1)
+
+    reads = [one.read_holding_registers(a, 1) for a in range(3)]
+    reads.append(two.read_holding_registers(0, 1))
+    task = asyncio.gather(*reads)
+    await asyncio.sleep(0.005)  # first read on the bus
+    await asyncio.gather(wone.write_registers(5, [1]), task)
+
+    assert bus == ["r1", "w1", "r2", "r1", "r1"]
+    assert arb.requests == 5
+    assert arb.queue_max == 4
+    assert 0.5 < arb.utilisation <= 1
+
+
+async def test_merge_identical_reads() -> None:
+    """Identical reads share a response, unless they started before a write."""
+    bus = _Bus()
+    arb = BusArbiter()
+    inv = bus.unit("r", {1: 7})
+    one, also = arb.unit(inv, key=1), arb.unit(inv, key=1)
+
+    res = await asyncio.gather(
+        one.read_holding_registers(1, 1), also.read_holding_registers(1, 1)
+    )
+    assert res == [[7], [7]]
+    assert (arb.requests, arb.merged) == (1, 1)
+
+    # Started before the write: a later read is not merged into it
+    first = asyncio.create_task(one.read_holding_registers(1, 1))
+    await asyncio.sleep(0.005)
+    await one.write_registers(1, [8])
+    assert await one.read_holding_registers(1, 1) == [8]
+    assert await first == [7]
+    assert arb.merged == 1
+
+    arb.reset()
+    assert arb.attributes() == {
+        "bus_utilisation": 0,
+        "bus_requests": 0,
+        "bus_merged": 0,
+        "bus_queue_max": 0,
+    }
+
+
+async def test_airtime_counts_merged_once() -> None:
+    """Bus bytes are counted per request on the bus, not per waiter."""
+    air = BusAirtime()
+    arb = BusArbiter(airtime=air)
+    inv = FakeInverter(registers={1: 7}, latency=0.01)
+    one, two = (
+        Sunsynk(unit=arb.unit(inv, key=1), airtime=air, read_attempts=1)
+        for _ in range(2)
+    )
+
+    await asyncio.gather(
+        one.read_holding_registers(1, 1), two.read_holding_registers(1, 1)
+    )
+    assert (arb.requests, arb.merged) == (1, 1)
+    assert (air.requests, air.tx_bytes, air.rx_bytes) == (1, 8, 7)
+
+    await one.write_register(address=1, value=8)
+    assert (air.requests, air.tx_bytes, air.rx_bytes) == (2, 19, 15)
+
+
+async def test_errors_reach_all_waiters() -> None:
+    """A failed request fails every merged read."""
+    arb = BusArbiter()
+    inv = FakeInverter(timeout_rate=1, timeout=0)
+    one = arb.unit(inv, key=1)
+    res = await asyncio.gather(
+        one.read_holding_registers(1, 1),
+        one.read_holding_registers(1, 1),
+        return_exceptions=True,
+    )
+    assert [type(r) for r in res] == [TimeoutError, TimeoutError]
+    assert inv.requests == 1
+    with pytest.raises(TimeoutError):
+        await one.read_holding_registers(1, 1)
@@ -0,0 +1,105 @@
+"""Test the simulated inverter."""
+
+import asyncio
+import struct
+from unittest.mock import MagicMock
+
+import pytest
+
+from sunsynk import Sunsynk
+from sunsynk.definitions import import_defs
+from sunsynk.sensors import Sensor
+from sunsynk.state import InverterState
+
+from .fake_inverter import HANDLERS, FakeInverter, _connection, crc16, rtu_frame, serve
+
+
+def test_crc16() -> None:
+    """Known RTU frame: 01 03 00 00 00 01 84 0A."""
+    assert crc16(bytes.fromhex("010300000001")) == 0x0A84
+    assert rtu_frame(1, bytes.fromhex("0300000001")).hex() == "010300000001840a"
+
+
+async def test_fake_unit(state: InverterState) -> None:
+    """Use the fake inverter as the unit of a Sunsynk."""
+    ss = Sunsynk(unit=FakeInverter(registers={1: 5, 2: 0xFFFF}), state=state)
+    sensors = [Sensor(1, "one"), Sensor(2, "two", factor=-1)]
+    state.track(*sensors)
+    await ss.read_sensors(sensors)
+    assert [state[s] for s in sensors] == [5, -1]
+
+    await ss.write_register(address=1, value=7)
+    assert await ss.read_holding_registers(1, 1) == [7]
+
+
+async def test_fake_timeout() -> None:
+    """Dropped requests time out."""
+    inv = FakeInverter(timeout_rate=1, timeout=0)
+    with pytest.raises(TimeoutError):
+        await inv.read_holding_registers(1, 1)
+    assert inv.dropped == inv.requests == 1
+
+
+def test_from_definitions() -> None:
+    """Measurements drift, settings stay."""
+    defs = import_defs("single-phase")
+    inv = FakeInverter.from_definitions(defs, seed=1, drift=10)
+    assert inv.dynamic
+    before = dict(inv.registers)
+    inv.read(0, 1)
+    assert inv.registers != before
+    assert all(inv.registers[a] == before[a] for a in before if a not in inv.dynamic)
+
+
+async def _request(url: str, frame: bytes, size: int) -> bytes:
+    """Send a raw request to a server, return ``size`` response bytes."""
+    host, _, port = url.partition("://")[2].rpartition(":")
+    reader, writer = await asyncio.open_connection(host, int(port))
+    try:
+        writer.write(frame)
+        return await reader.readexactly(size)
+    finally:
+        writer.close()
+
+
+async def test_serve() -> None:
+    """Serve tcp://, serial-tcp:// and solarman-tcp://."""
+    units = {1: FakeInverter(registers={1: 5, 2: 0xFFFF})}
+    read = struct.pack(">BHH", 0x03, 1, 2)
+    reply = bytes.fromhex("03040005ffff")
+
+    server, url = await serve("tcp://127.0.0.1:0", units)
+    async with server:
+        mbap = struct.pack(">HHHB", 7, 0, len(read) + 1, 1) + read
+        res = await _request(url, mbap, 13)
+        assert res == struct.pack(">HHHB", 7, 0, 7, 1) + reply
+
+    server, url = await serve("serial-tcp://127.0.0.1:0", units)
+    async with server:
+        assert await _request(url, rtu_frame(1, read), 9) == rtu_frame(1, reply)
+
+    server, url = await serve("solarman-tcp://127.0.0.1:0", units)
+    async with server:
+        payload = struct.pack("<BHIII", 0x02, 0, 0, 0, 0) + rtu_frame(1, read)
+        frame = struct.pack("<BHHHI", 0xA5, len(payload), 0x4510, 5, 1234) + payload
+        frame += bytes((sum(frame[1:]) & 0xFF, 0x15))
+        res = await _request(url, frame, 13 + 14 + 9)
+        assert res[3:5] == struct.pack("<H", 0x1510)
+        assert res[5:11] == frame[5:11]  # sequence and logger serial echoed
+        assert res[25:-2] == rtu_frame(1, reply)
+        assert res[-2] == sum(res[1:-2]) & 0xFF
+
+    with pytest.raises(ValueError, match="Unknown scheme"):
+        await serve("udp://127.0.0.1:0", units)
+
+
+async def test_connection_shutdown() -> None:
+    """A connection cancelled on shutdown closes its writer without an error."""
+    writer = MagicMock(asyncio.StreamWriter)
+    task = asyncio.create_task(
+        _connection(HANDLERS["tcp"], {}, asyncio.StreamReader(), writer)
+    )
+    await asyncio.sleep(0)
+    task.cancel()
+    await task
+    writer.close.assert_called_once()
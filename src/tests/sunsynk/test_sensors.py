@@ -2,7 +2,7 @@
 
 import logging
 from collections.abc import Iterable, Sequence
-from itertools import pairwise
+from itertools import pairwise, product
 
 import pytest
 
@@ -12,17 +12,19 @@ from sunsynk.sensors import (
     BinarySensor,
     Constant,
     FaultSensor,
+    HVFaultSensor,
     InverterStateSensor,
     MathSensor,
     SDStatusSensor,
     Sensor,
     Sensor16,
+    Sensor16Window,
     SensorDefinitions,
     SerialSensor,
     TempSensor,
     ensure_slugs,
 )
-from sunsynk.state import InverterState, group_sensors
+from sunsynk.state import InverterState, _plan, group_sensors, plan_groups
 
 _LOG = logging.getLogger(__name__)
 
@@ -128,6 +130,39 @@ def test_sensor16() -> None:
     assert s.reg_to_value((0x0, 0xFFFF)) == 0
 
 
+def test_compile_decoder() -> None:
+    """Plain sensors get a specialised decoder, subclasses keep reg_to_value."""
+    sensors = [
+        Sensor(1, "u16", factor=0.1),
+        Sensor(2, "s16", factor=-1),
+        Sensor(2, "s16 scaled", factor=-0.1),
+        Sensor((3, 4), "s32", factor=-0.01),
+        Sensor((3, 4), "u32"),
+        Sensor(5, "mask", bitmask=0xF0),
+    ]
+    regs = [0, 1, 0x7FFF, 0x8000, 0x8001, 0xFFFE, 0xFFFF]
+    for sen in sensors:
+        assert sen.decoder != sen.reg_to_value
+        for reg in (
+            [(r,) for r in regs] if len(sen.address) == 1 else product(regs, regs)
+        ):
+            assert sen.decoder(reg) == sen.reg_to_value(reg), (sen.name, reg)
+
+    temp = TempSensor(8, "temp", factor=0.1)
+    assert temp.decoder == temp.reg_to_value
+    assert temp.decoder((1250,)) == 25
+
+
+def test_sensor16_window() -> None:
+    """Running sum and zero count over the last readings."""
+    win = Sensor16Window(size=3)
+    for reg0, reg1 in ((10, 0), (20, 1), (30, 1)):
+        win.push(reg0, reg1)
+    assert (win.count, win.sum0, win.zeros1, win.mean0) == (3, 60, 1, 20)
+    win.push(40, 1)
+    assert (win.count, win.sum0, win.zeros1, win.mean0) == (3, 90, 0, 30)
+
+
 def test_group() -> None:
     """Tests."""
     sen = [
@@ -169,6 +204,37 @@ def test_group_max_size() -> None:
     assert g == [[10], [13, 14, 15], [16], [111, 112]]
 
 
+def test_plan_groups() -> None:
+    """Read a gap only when it is cheaper than another request."""
+    sen = [
+        Sensor(10, "10"),
+        Sensor(11, "11"),
+        Sensor(12, "12"),
+        Sensor(20, "20"),
+    ]
+    assert plan_groups(sen, request_cost=3) == [[10, 11, 12], [20]]
+    assert plan_groups(sen, request_cost=10) == [[10, 11, 12, 20]]
+    assert plan_groups(sen, request_cost=100, max_group_size=3) == [
+        [10, 11, 12],
+        [20],
+    ]
+    assert plan_groups([], request_cost=1) == []
+
+    hits = _plan.cache_info().hits
+    assert plan_groups(reversed(sen), request_cost=3) == [[10, 11, 12], [20]]
+    assert _plan.cache_info().hits == hits + 1
+
+
+def test_plan_all_groups() -> None:
+    """Every register is read exactly once, within the max group size."""
+    s = [SENSORS.all[s] for s in SENSORS.all]
+    regs = sorted({r for sen in s for r in sen.address})
+    for cost in (1, 5, 30):
+        grp = plan_groups(s, request_cost=cost, max_group_size=20)
+        assert [r for g in grp for r in g] == regs
+        assert all(g[-1] - g[0] < 20 for g in grp)
+
+
 def test_all_groups() -> None:
     """Tests."""
     s = [SENSORS.all[s] for s in SENSORS.all]
@@ -279,6 +345,14 @@ def test_decode_fault() -> None:
     regs = (0x0, 0x0, 0x1, 0x0)
     assert s.reg_to_value(regs) == "F33"
 
+    regs = (0x1000, 0x2, 0x0, 0x0)
+    assert s.reg_to_value(regs) == "F13 Working mode change, F18 AC over current"
+    assert s.reg_to_value(list(regs)) == s.reg_to_value(regs)  # type:ignore[arg-type]
+
+    hv = HVFaultSensor(1, "", "")
+    assert hv.reg_to_value((0x1, 0x0, 0x0, 0x0)) == "F01 DC Inversed Failure"
+    assert hv.reg_to_value((0x0, 0x0, 0x0, 0x0)) == ""
+
 
 def test_sensor_alias_registered_as_slug() -> None:
     """String ``alias`` is one alternate name; registry keys match ``slug()`` (config / get_sensors)."""
@@ -348,11 +422,24 @@ def test_override() -> None:
     """Tests."""
     sen = SensorDefinitions()
     s0 = Sensor(1, "test sensor", "V", -1)
-    sen += s0
+    other = Sensor(2, "other")
+    sen += (s0, other)
+    decoder = other.decoder
     sen.override({"test_sensor.factor": -99})
     s1 = sen.all["test_sensor"]
     assert s0.factor == -1
     assert s1.factor == -99
+    assert s0.decoder((0xFFFF,)) == -1
+    assert s1.decoder((0xFFFF,)) == -99
+    assert sen.all["other"].decoder is decoder
+    assert s1 == s0
+    assert hash(s1) == hash(s0)
+
+    sen.override({"test_sensor.name": "Renamed"})
+    s2 = sen.all["test_sensor"]
+    assert s2.id == "renamed"
+    assert s2 != s0
+    assert hash(s2) == hash(Sensor(1, "Renamed"))
 
 
 def test_override_const() -> None:
@@ -380,6 +467,23 @@ def test_override_const() -> None:
     assert s1.value_to_reg(0, ist) == (44,)
 
 
+def test_override_chain() -> None:
+    """Referrers of a copied sensor are copied in turn."""
+    c0 = Constant((), "constant sensor", value=42)
+    s0 = NumberRWSensor(1, "rw sensor", min=c0)
+    t0 = NumberRWSensor(2, "rw top", max=s0)
+    sen = SensorDefinitions()
+    sen += (c0, s0, t0, Sensor(3, "unrelated"))
+    sen.override({"constant_sensor": 44})
+
+    s1, t1 = sen.all["rw_sensor"], sen.all["rw_top"]
+    assert isinstance(s1, NumberRWSensor) and isinstance(t1, NumberRWSensor)
+    assert s1 is not s0 and t1 is not t0
+    assert s1.min is sen.all["constant_sensor"]
+    assert t1.max is s1
+    assert t0.max is s0
+
+
 def test_override_many() -> None:
     """Tests."""
     sen = SensorDefinitions()
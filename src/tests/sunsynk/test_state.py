@@ -1,11 +1,13 @@
 """Sunsynk sensor state."""
 
 import logging
+from dataclasses import dataclass
 
 import pytest
 
+from sunsynk.helpers import RegType, ValType
 from sunsynk.rwsensors import SystemTimeRWSensor
-from sunsynk.sensors import BinarySensor, Sensor
+from sunsynk.sensors import BinarySensor, EnumSensor, Sensor, Sensor16
 from sunsynk.state import InverterState
 
 _LOG = logging.getLogger(__name__)
@@ -18,20 +20,20 @@ def test_history(state: InverterState) -> None:
 
     state.update({1: 100})
     assert state[a] == 100
-    assert state.history[a] == [100]
+    assert list(state.history[a]) == [100]
 
     state.update({1: 200})
     assert state[a] == 200
-    assert state.history[a] == [100, 200]
+    assert list(state.history[a]) == [100, 200]
 
     state.update({1: 300})
     assert state[a] == 300
-    assert state.history[a] == [100, 200, 300]
+    assert list(state.history[a]) == [100, 200, 300]
 
     assert a not in state.historynn
 
     assert state.history_average(a) == 250
-    assert state.history[a] == [250]
+    assert list(state.history[a]) == [250]
 
 
 def test_history_raise(state: InverterState) -> None:
@@ -44,12 +46,12 @@ def test_history_raise(state: InverterState) -> None:
     state.update({2: 100})
     assert state[a] == 100
     assert state.history_average(a) == 100
-    assert state.history[a] == [100]
+    assert list(state.history[a]) == [100]
 
     state.update({2: 111})
-    assert state.history[a] == [100, 111]
+    assert list(state.history[a]) == [100, 111]
     assert state.history_average(a) == 111
-    assert state.history[a] == [111]
+    assert list(state.history[a]) == [111]
 
 
 def test_history_nn(state: InverterState) -> None:
@@ -82,3 +84,123 @@ def test_history_nn_binary(state: InverterState) -> None:
     state.update({1: 0, 2: 5, 3: 44})
     assert state.historynn[a] == [True, False]
     assert a not in state.history
+
+
+def test_update_by_address(state: InverterState) -> None:
+    """Only sensors with registers in the update are decoded."""
+    a = Sensor(1, "A")
+    b = BinarySensor(1, "B", bitmask=0x1)
+    c = Sensor((2, 3), "C")
+    state.track(a, b, c)
+    state.track(a)  # tracking again does not duplicate the index
+    assert state.by_address == {1: [a, b], 2: [c], 3: [c]}
+
+    state.update({1: 3, 10: 5})
+    assert (state[a], state[b], state[c]) == (3, True, None)
+
+    state.update({3: 1})
+    assert state[c] == 0x10000
+    assert state.registers == {1: 3, 3: 1, 10: 5}
+
+
+def test_state_history_capped(state: InverterState) -> None:
+    """History keeps ``history_size`` readings, but averages all of them."""
+    sen = Sensor(1, "s")
+    state.track(sen, history_size=3)
+    for val in range(10):
+        state.update({1: val})
+    assert list(state.history[sen]) == [0, 7, 8, 9]
+    assert state.history_average(sen) == 5  # 1..9, after the first value
+    assert list(state.history[sen]) == [5]
+
+    for val in (20, 21, 22, 23, 24):
+        state.update({1: val})
+    assert state.history_average(sen) == 22
+
+
+@dataclass(slots=True, eq=False)
+class CountSensor(Sensor):
+    """Count decodes."""
+
+    calls: int = 0
+
+    def reg_to_value(self, regs: RegType) -> ValType:
+        """Decode & count."""
+        self.calls += 1
+        return regs[0]
+
+
+def test_update_unchanged_registers(state: InverterState) -> None:
+    """Unchanged registers reuse the last value, but still feed the history."""
+    sen = CountSensor(1, "counter")
+    state.track(sen)
+
+    state.update({1: 5})
+    state.update({1: 5})
+    assert sen.calls == 1
+    assert list(state.history[sen]) == [5, 5]
+
+    state.update({1: 6})
+    assert sen.calls == 2
+    assert state[sen] == 6
+
+    # A write updates state.registers without decoding; the next read must decode
+    state.registers[1] = 9
+    state.update({1: 9})
+    assert sen.calls == 3
+    assert state[sen] == 9
+
+
+def test_sensor16_window_per_state() -> None:
+    """Two inverters sharing a Sensor16 definition keep their own window."""
+    sen = Sensor16((1, 2), "power", "W", -1)
+    inv1, inv2 = InverterState(), InverterState()
+    inv1.track(sen)
+    inv2.track(sen)
+
+    inv1.update({1: 0xFFFF, 2: 0x0})  # reg[1] == 0: 16-bit for the next 10 reads
+    assert inv1[sen] == -1
+    inv2.update({1: 0x0, 2: 0x1})
+    assert inv2[sen] == 0x10000
+    inv1.update({1: 0x0, 2: 0x1})
+    assert inv1[sen] == 0
+    assert sen.window.count == 0
+
+
+def test_enum_warning_per_state(caplog: pytest.LogCaptureFixture) -> None:
+    """Each inverter warns once about an unknown enum value."""
+    sen = EnumSensor(1, "mode", options={0: "off", 1: "on"})
+    inv1, inv2 = InverterState(), InverterState()
+    inv1.track(sen)
+    inv2.track(sen)
+    assert inv1.slots[inv1.index[sen]] is not inv2.slots[inv2.index[sen]]
+
+    with caplog.at_level(logging.WARNING):
+        for val in (5, 6):
+            inv1.update({1: val})
+        inv2.update({1: 5})
+    assert caplog.text.count("Unknown register value") == 2
+    assert sen._warning.warn
+
+
+def test_snapshot_restore(state: InverterState) -> None:
+    """Restored values are stale until their registers are read."""
+    one, two = Sensor(1, "one"), Sensor((2, 3), "two")
+    state.track(one, two)
+    state.update({1: 5, 2: 0xFFFF, 3: 1, 9: 9})
+    data = state.snapshot()
+    assert len(data) == 6 + 4 * 3  # register 9 is not tracked
+
+    new = InverterState()
+    new.track(one, two)
+    assert new.restore(data) == {one, two}
+    assert (new[one], new[two]) == (5, state[two])
+    assert new.stale == {one, two}
+
+    new.update({1: 6})
+    assert new.stale == {two}
+
+    with pytest.raises(ValueError):
+        new.restore(data[:-1])
+    with pytest.raises(ValueError):
+        new.restore(b"junk" + data[4:])
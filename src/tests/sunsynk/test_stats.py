@@ -4,7 +4,7 @@ import math
 
 import pytest
 
-from sunsynk.utils.stats import percentile
+from sunsynk.utils.stats import History, RingBuffer, percentile
 
 
 @pytest.mark.parametrize(
@@ -71,3 +71,47 @@ def test_percentile_one_value() -> None:
     assert percentile([0.0], 50) == 0.0
     assert percentile([0.0], 0) == 0.0
     assert percentile([0.0], 100) == 0.0
+
+
+def test_ring_buffer() -> None:
+    """Oldest values drop out and the running sum follows."""
+    buf = RingBuffer(3)
+    assert len(buf) == 0
+    with pytest.raises(IndexError):
+        buf[-1]
+
+    for val in (1, 2, 3, 4.5):
+        buf.append(val)
+    assert list(buf) == [2, 3, 4.5]
+    assert isinstance(buf[0], int)
+    assert (buf[0], buf[-1], len(buf), buf.total) == (2, 4.5, 3, 9.5)
+
+    buf.append(5)  # wraps to the start, running sum is resynced
+    assert list(buf) == [3, 4.5, 5]
+    assert buf.total == 12.5
+
+    buf.clear()
+    buf.append(7)
+    assert list(buf) == [7]
+    assert buf.total == 7
+
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_history() -> None:
+    """The first value and the totals survive a full ring."""
+    hist = History(2)
+    assert list(hist) == []
+    for val in (10.4, 1, 2, 3):
+        hist.append(val)
+    assert list(hist) == [10.4, 2, 3]
+    assert (len(hist), hist.total, hist.first) == (4, 16.4, 10.4)
+    assert (hist[0], hist[-1], hist[-2]) == (10.4, 3, 2)
+    with pytest.raises(IndexError):
+        hist[1]  # evicted
+
+    hist.clear()
+    assert (len(hist), hist.total) == (0, 0)
+    hist.append(7)
+    assert (list(hist), hist[-1]) == ([7], 7)
@@ -11,9 +11,7 @@ from sunsynk import Sunsynk
 from sunsynk.rwsensors import NumberRWSensor
 from sunsynk.sensors import Sensor
 from sunsynk.state import InverterState
-
-# All test coroutines will be treated as marked.
-pytestmark = pytest.mark.asyncio
+from sunsynk.sunsynk import BatchTuner, BusAirtime, rtu_bytes
 
 _LOG = logging.getLogger(__name__)
 
@@ -177,3 +175,90 @@ async def test_ss_rejects_response_length_mismatch(
     assert state[single] == 5
     assert state[pair] == 7 << 16
     assert state.registers == {1: 5, 10: 0, 11: 7}
+
+
+def test_ss_plan_memoized(state: InverterState) -> None:
+    """Register groups are reused for the same frozenset and settings."""
+    ss = _ss()
+    ss.state = state
+    sensors = frozenset((Sensor(1, "One"), Sensor(2, "Two"), Sensor(10, "Ten")))
+    state.track(*sensors)
+
+    groups = ss.plan(sensors)
+    assert groups == [[1, 2], [10]]
+    assert ss.plan(sensors) is groups
+    assert ss.plan(list(sensors)) is not groups
+
+    ss.read_sensors_batch_size = 1
+    assert ss.plan(sensors) == [[1], [2], [10]]
+
+
+async def test_ss_rtt(state: InverterState) -> None:
+    """The measured round trip estimates the time to read sensors."""
+    unit = MagicMock()
+
+    async def rhr(start: int, length: int) -> Sequence[int]:
+        await asyncio.sleep(0.01)
+        return [0] * length
+
+    unit.read_holding_registers = rhr
+    ss = Sunsynk(unit=unit, state=state)
+    sensors = frozenset((Sensor(1, "One"), Sensor(2, "Two"), Sensor(50, "Fifty")))
+    state.track(*sensors)
+    assert ss.read_time(sensors) == 0
+
+    # Before the first read: the airtime at the baud rate of the port
+    air = ss.airtime = BusAirtime(baudrate=19200)
+    assert ss.read_time(sensors) == pytest.approx(
+        air.request_time(0x03, 2) + air.request_time(0x03, 1)
+    )
+
+    await ss.read_sensors(sensors)
+    assert 0.01 <= ss.rtt < 0.1
+    assert ss.read_time(sensors) == 2 * ss.rtt
+
+
+def test_bus_airtime() -> None:
+    """RTU bytes and airtime at the baud rate."""
+    assert rtu_bytes(0x03, 10) == (8, 25)
+    assert rtu_bytes(0x10, 1) == (11, 8)
+
+    air = BusAirtime(spacing=0.05)
+    # 33 bytes and two 3.5 character gaps, 11 bits each at 9600 baud
+    assert air.request_time(0x03, 10) == pytest.approx(40 * 11 / 9600 + 0.05)
+
+    air.record(0x03, 10)
+    air.record(0x03, 10, answered=False)
+    assert (air.requests, air.tx_bytes, air.rx_bytes) == (2, 16, 25)
+    air.since -= 1
+    attr = air.attributes()
+    assert attr["bus_airtime"] == pytest.approx(55 * 11 / 9600, abs=0.001)
+    assert attr["bus_spacing"] == pytest.approx(0.1, abs=0.001)
+    assert attr["bus_idle"] == pytest.approx(
+        1 - attr["bus_airtime"] - attr["bus_spacing"], abs=0.002
+    )
+
+    air.reset()
+    assert air.attributes()["bus_tx_bytes"] == 0
+
+
+def test_batch_tuner() -> None:
+    """Shrink on timeouts, grow after successful reads, measure the request cost."""
+    tuner = BatchTuner(size=20, grow_after=2)
+    tuner.record(20, None)
+    assert tuner.size == 10
+    assert tuner.ceiling == 20
+
+    tuner.record(4, 0.14)  # too short to count
+    assert tuner.size == 10
+    tuner.record(10, 0.2)
+    tuner.record(10, 0.2)
+    assert tuner.size == 11
+
+    assert tuner.request_cost == pytest.approx(10)
+    assert tuner.attributes() == {
+        "batch_size": 11,
+        "batch_ceiling": 20,
+        "timeout_rate": 0.25,
+        "request_cost": 10.0,
+    }